@@ -0,0 +1,139 @@
+"""
+Benchmark of RingArrayManager against ArrayManager, both with update_bar
+only and inside BacktestingEngine.run_backtesting with AtrRsiStrategy.
+
+Bar data is generated by random walk, so no database is needed.
+"""
+
+import hashlib
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from vnpy.app.cta_strategy.backtesting import BacktestingEngine
+from vnpy.app.cta_strategy.strategies.atr_rsi_strategy import AtrRsiStrategy
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData
+from vnpy.trader.utility import ArrayManager, RingArrayManager
+
+
+BAR_COUNT = 60_000
+SIZES = [100, 1000, 5000]
+
+
+class BenchmarkStrategy(AtrRsiStrategy):
+    """
+    AtrRsiStrategy with array manager class and size set by parameters.
+    """
+
+    am_size = 100
+    ring = False
+
+    parameters = AtrRsiStrategy.parameters + ["am_size", "ring"]
+
+    def __init__(self, cta_engine, strategy_name, vt_symbol, setting):
+        """"""
+        super().__init__(cta_engine, strategy_name, vt_symbol, setting)
+
+        if self.ring:
+            self.am = RingArrayManager(self.am_size)
+        else:
+            self.am = ArrayManager(self.am_size)
+
+
+def generate_bars(count: int):
+    """"""
+    random.seed(0)
+
+    start = datetime(2020, 1, 1)
+    price = 4000
+    bars = []
+
+    for i in range(count):
+        open_price = price
+        price += random.choice([-2, -1, 0, 1, 2])
+        high_price = max(open_price, price) + random.randint(0, 2)
+        low_price = min(open_price, price) - random.randint(0, 2)
+
+        bars.append(BarData(
+            symbol="BENCH",
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=1,
+            open_price=open_price,
+            high_price=high_price,
+            low_price=low_price,
+            close_price=price,
+            gateway_name="DB"
+        ))
+
+    return bars
+
+
+def run_update_bar(bars: list, am_class: type, size: int) -> float:
+    """
+    Return average cost of update_bar in microseconds.
+    """
+    am = am_class(size)
+
+    start = perf_counter()
+    for bar in bars:
+        am.update_bar(bar)
+    cost = perf_counter() - start
+
+    return cost / len(bars) * 1_000_000
+
+
+def run_backtesting(bars: list, size: int, ring: bool):
+    """
+    Return cost in seconds, trade count and digest of trades.
+    """
+    engine = BacktestingEngine()
+    engine.output = lambda msg: None
+    engine.set_parameters(
+        vt_symbol="BENCH.SHFE",
+        interval=Interval.MINUTE,
+        start=datetime(2020, 1, 1),
+        end=datetime(2020, 12, 31),
+        rate=0,
+        slippage=0,
+        size=10,
+        pricetick=1,
+        capital=1_000_000
+    )
+    engine.add_strategy(BenchmarkStrategy, {"am_size": size, "ring": ring})
+    engine.history_data = bars
+
+    start = perf_counter()
+    engine.run_backtesting()
+    cost = perf_counter() - start
+
+    trades = engine.get_all_trades()
+    digest = hashlib.md5(repr([
+        (t.datetime, t.direction, t.price, t.volume) for t in trades
+    ]).encode()).hexdigest()
+
+    return cost, len(trades), digest
+
+
+def run():
+    """"""
+    bars = generate_bars(BAR_COUNT)
+
+    for size in SIZES:
+        array_cost = run_update_bar(bars, ArrayManager, size)
+        ring_cost = run_update_bar(bars, RingArrayManager, size)
+        print(f"update_bar size {size}: {array_cost:.1f}us -> {ring_cost:.1f}us")
+
+    for size in SIZES:
+        array_cost, count, array_digest = run_backtesting(bars, size, False)
+        ring_cost, _, ring_digest = run_backtesting(bars, size, True)
+        print(
+            f"run_backtesting size {size}: {array_cost:.2f}s -> {ring_cost:.2f}s, "
+            f"trades: {count}, same trades: {array_digest == ring_digest}"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,158 @@
+"""
+Benchmark of saving data into SQL database, bulk path of SqlManager
+against the previous row by row path.
+
+Uses a temporary SQLite file by default, change driver and settings
+below to test MySQL/PostgreSQL (tables of the database will be written).
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from peewee import chunked
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.database.database import Driver
+from vnpy.trader.database.database_sql import init
+from vnpy.trader.object import BarData, TickData
+
+
+driver = Driver.SQLITE
+settings = {
+    "database": os.path.join(tempfile.mkdtemp(), "benchmark.db")
+}
+
+BAR_COUNT = 200_000
+TICK_COUNT = 200_000
+
+
+def generate_bars(count: int):
+    """"""
+    start = datetime(2020, 1, 1)
+    return [
+        BarData(
+            symbol="BENCH",
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=i,
+            open_interest=i,
+            open_price=4000 + i % 100,
+            high_price=4010 + i % 100,
+            low_price=3990 + i % 100,
+            close_price=4005 + i % 100,
+            gateway_name="BENCH"
+        )
+        for i in range(count)
+    ]
+
+
+def generate_ticks(count: int):
+    """"""
+    start = datetime(2020, 1, 1)
+    return [
+        TickData(
+            symbol="BENCH",
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(milliseconds=500 * i),
+            name="BENCH",
+            volume=i,
+            open_interest=i,
+            last_price=4000 + i % 100,
+            bid_price_1=3999 + i % 100,
+            ask_price_1=4001 + i % 100,
+            bid_volume_1=10,
+            ask_volume_1=10,
+            gateway_name="BENCH"
+        )
+        for i in range(count)
+    ]
+
+
+def save_legacy(model, from_data, datas, conflict_target):
+    """
+    Previous path: model object of every data, then row by row
+    upsert for PostgreSQL and insert_many of 50 rows for others.
+    """
+    dicts = [from_data(d).to_dict() for d in datas]
+    db = model._meta.database
+
+    with db.atomic():
+        if driver is Driver.POSTGRESQL:
+            for d in dicts:
+                model.insert(d).on_conflict(
+                    update=d,
+                    conflict_target=[getattr(model, c) for c in conflict_target]
+                ).execute()
+        else:
+            for c in chunked(dicts, 50):
+                model.insert_many(c).on_conflict_replace().execute()
+
+
+def run(name: str, func, count: int):
+    """"""
+    start = perf_counter()
+    func()
+    cost = perf_counter() - start
+    print(f"{name:<24}{count / cost:>12,.0f} rows/s{cost:>10.2f}s")
+
+
+def main():
+    """"""
+    manager = init(driver, settings)
+    bars = generate_bars(BAR_COUNT)
+    ticks = generate_ticks(TICK_COUNT)
+
+    print(f"driver: {driver.value}, bars: {BAR_COUNT}, ticks: {TICK_COUNT}")
+
+    manager.clean("BENCH")
+    run(
+        "bar legacy insert",
+        lambda: save_legacy(
+            manager.class_bar, manager.class_bar.from_bar, bars,
+            ["symbol", "exchange", "interval", "datetime"]
+        ),
+        BAR_COUNT
+    )
+    run(
+        "bar legacy upsert",
+        lambda: save_legacy(
+            manager.class_bar, manager.class_bar.from_bar, bars,
+            ["symbol", "exchange", "interval", "datetime"]
+        ),
+        BAR_COUNT
+    )
+
+    manager.clean("BENCH")
+    run("bar bulk insert", lambda: manager.save_bar_data(bars), BAR_COUNT)
+    run("bar bulk upsert", lambda: manager.save_bar_data(bars), BAR_COUNT)
+
+    manager.clean("BENCH")
+    run(
+        "tick legacy insert",
+        lambda: save_legacy(
+            manager.class_tick, manager.class_tick.from_tick, ticks,
+            ["symbol", "exchange", "datetime"]
+        ),
+        TICK_COUNT
+    )
+    run(
+        "tick legacy upsert",
+        lambda: save_legacy(
+            manager.class_tick, manager.class_tick.from_tick, ticks,
+            ["symbol", "exchange", "datetime"]
+        ),
+        TICK_COUNT
+    )
+
+    manager.clean("BENCH")
+    run("tick bulk insert", lambda: manager.save_tick_data(ticks), TICK_COUNT)
+    run("tick bulk upsert", lambda: manager.save_tick_data(ticks), TICK_COUNT)
+
+    manager.clean("BENCH")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark of CTA backtesting with a grid strategy, which keeps hundreds
+of resting limit and stop orders during the whole backtesting.
+
+Bar data is generated by random walk, so no database is needed.
+"""
+
+import hashlib
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from vnpy.app.cta_strategy import CtaTemplate, BarData, TradeData
+from vnpy.app.cta_strategy.backtesting import BacktestingEngine
+from vnpy.trader.constant import Direction, Exchange, Interval
+
+
+BAR_COUNT = 100_000
+
+
+class GridStrategy(CtaTemplate):
+    """
+    Limit orders are placed on every grid level around the first price,
+    once an order is traded, a reverse order is placed one level away.
+    Stop orders are placed outside the grid.
+    """
+
+    grid_step = 2
+    grid_count = 200
+    stop_count = 50
+
+    parameters = ["grid_step", "grid_count", "stop_count"]
+
+    def __init__(self, cta_engine, strategy_name, vt_symbol, setting):
+        """"""
+        super().__init__(cta_engine, strategy_name, vt_symbol, setting)
+
+        self.started = False
+
+    def on_init(self):
+        """"""
+        self.load_bar(1)
+
+    def on_bar(self, bar: BarData):
+        """"""
+        if not self.trading or self.started:
+            return
+        self.started = True
+
+        price = bar.close_price
+        step = self.grid_step
+
+        for i in range(1, self.grid_count + 1):
+            self.buy(price - i * step, 1)
+            self.short(price + i * step, 1)
+
+        for i in range(self.grid_count + 1, self.grid_count + self.stop_count + 1):
+            self.buy(price + i * step, 1, stop=True)
+            self.short(price - i * step, 1, stop=True)
+
+    def on_trade(self, trade: TradeData):
+        """"""
+        if trade.direction == Direction.LONG:
+            self.short(trade.price + self.grid_step, 1)
+        else:
+            self.buy(trade.price - self.grid_step, 1)
+
+
+def generate_bars(count: int):
+    """"""
+    random.seed(0)
+
+    start = datetime(2020, 1, 1)
+    price = 4000
+    bars = []
+
+    for i in range(count):
+        open_price = price
+        price += random.choice([-2, -1, 0, 1, 2])
+        high_price = max(open_price, price) + random.randint(0, 2)
+        low_price = min(open_price, price) - random.randint(0, 2)
+
+        bars.append(BarData(
+            symbol="GRID",
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=1,
+            open_price=open_price,
+            high_price=high_price,
+            low_price=low_price,
+            close_price=price,
+            gateway_name="DB"
+        ))
+
+    return bars
+
+
+def run():
+    """"""
+    engine = BacktestingEngine()
+    engine.output = lambda msg: None
+    engine.set_parameters(
+        vt_symbol="GRID.SHFE",
+        interval=Interval.MINUTE,
+        start=datetime(2020, 1, 1),
+        end=datetime(2020, 12, 31),
+        rate=0,
+        slippage=0,
+        size=10,
+        pricetick=1,
+        capital=1_000_000
+    )
+    engine.add_strategy(GridStrategy, {})
+    engine.history_data = generate_bars(BAR_COUNT)
+
+    start = perf_counter()
+    engine.run_backtesting()
+    cost = perf_counter() - start
+
+    trades = engine.get_all_trades()
+    digest = hashlib.md5(repr([
+        (t.datetime, t.direction, t.price, t.volume) for t in trades
+    ]).encode()).hexdigest()
+
+    print(f"Bars: {BAR_COUNT}, trades: {len(trades)}, cost: {cost:.2f}s")
+    print(f"Trades digest: {digest}")
+
+
+if __name__ == "__main__":
+    run()
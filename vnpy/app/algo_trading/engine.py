@@ -29,6 +29,7 @@ class AlgoEngine(BaseEngine):
         self.algos = {}
         self.symbol_algo_map = {}
         self.orderid_algo_map = {}
+        self.timer_algos = {}   # timer interval: set of algo names
 
         self.algo_templates = {}
         self.algo_settings = {}
@@ -104,7 +105,8 @@ class AlgoEngine(BaseEngine):
         algos = list(self.algos.values())
 
         for algo in algos:
-            algo.update_timer()
+            if algo.timer_type == event.type:
+                algo.update_timer()
 
     def process_trade_event(self, event: Event):
         """"""
@@ -128,6 +130,8 @@ class AlgoEngine(BaseEngine):
         algo_template = self.algo_templates[template_name]
 
         algo = algo_template.new(self, setting)
+
+        self.add_algo_timer(algo)
         algo.start()
 
         self.algos[algo.algo_name] = algo
@@ -140,6 +144,37 @@ class AlgoEngine(BaseEngine):
             algo.stop()
             self.algos.pop(algo_name)
 
+    def add_algo_timer(self, algo: AlgoTemplate):
+        """
+        Add dedicated timer of algo, shared by algos with same interval.
+        """
+        interval = algo.timer_interval
+        if not interval:
+            return
+
+        if interval not in self.timer_algos:
+            self.timer_algos[interval] = set()
+            self.event_engine.add_timer(interval)
+            self.event_engine.register(algo.timer_type, self.process_timer_event)
+
+        self.timer_algos[interval].add(algo.algo_name)
+
+    def remove_algo_timer(self, algo: AlgoTemplate):
+        """
+        Remove dedicated timer of algo if not used by other algos.
+        """
+        algo_names = self.timer_algos.get(algo.timer_interval, None)
+        if not algo_names:
+            return
+
+        algo_names.discard(algo.algo_name)
+        if algo_names:
+            return
+
+        self.timer_algos.pop(algo.timer_interval)
+        self.event_engine.unregister(algo.timer_type, self.process_timer_event)
+        self.event_engine.remove_timer(algo.timer_interval)
+
     def stop_all(self):
         """"""
         for algo_name in list(self.algos.keys()):
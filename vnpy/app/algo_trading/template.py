@@ -1,3 +1,4 @@
+from vnpy.event import EVENT_TIMER, get_timer_type
 from vnpy.trader.engine import BaseEngine
 from vnpy.trader.object import TickData, OrderData, TradeData
 from vnpy.trader.constant import OrderType, Offset, Direction
@@ -11,6 +12,7 @@ class AlgoTemplate:
     display_name = ""
     default_setting = {}
     variables = []
+    timer_interval = 0      # seconds between on_timer calls, 0 for default timer
 
     def __init__(
         self,
@@ -27,6 +29,11 @@ class AlgoTemplate:
 
         self.variables.insert(0, "active")
 
+        if self.timer_interval:
+            self.timer_type = get_timer_type(self.timer_interval)
+        else:
+            self.timer_type = EVENT_TIMER
+
     @classmethod
     def new(cls, algo_engine: BaseEngine, setting: dict):
         """Create new algo instance"""
@@ -98,6 +105,7 @@ class AlgoTemplate:
     def stop(self):
         """"""
         self.active = False
+        self.algo_engine.remove_algo_timer(self)
         self.cancel_all()
         self.on_stop()
         self.put_variables_event()
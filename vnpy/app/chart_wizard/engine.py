@@ -7,6 +7,7 @@ from vnpy.trader.engine import BaseEngine, MainEngine
 from vnpy.trader.constant import Interval
 from vnpy.trader.object import HistoryRequest, ContractData
 from vnpy.trader.rqdata import rqdata_client
+from vnpy.trader.history import history_cache
 
 
 APP_NAME = "ChartWizard"
@@ -56,9 +57,16 @@ class ChartWizardEngine(BaseEngine):
         )
 
         if contract.history_data:
-            data = self.main_engine.query_history(req, contract.gateway_name)
+            gateway_name = contract.gateway_name
+            data = history_cache.query_history(
+                req,
+                lambda req: self.main_engine.query_history(req, gateway_name),
+                gateway_name
+            )
         else:
-            data = rqdata_client.query_history(req)
+            data = history_cache.query_history(
+                req, rqdata_client.query_history, "RQ"
+            )
 
         event = Event(EVENT_CHART_HISTORY, data)
         self.event_engine.put(event)
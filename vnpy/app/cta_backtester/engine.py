@@ -14,7 +14,11 @@ from vnpy.trader.object import HistoryRequest
 from vnpy.trader.rqdata import rqdata_client
 from vnpy.trader.database import database_manager
 from vnpy.app.cta_strategy import CtaTemplate
-from vnpy.app.cta_strategy.backtesting import BacktestingEngine, OptimizationSetting
+from vnpy.app.cta_strategy.backtesting import (
+    BacktestingEngine,
+    OptimizationSetting,
+    OptimizationRunner
+)
 
 APP_NAME = "CtaBacktester"
 
@@ -43,6 +47,9 @@ class BacktesterEngine(BaseEngine):
         # Optimization result
         self.result_values = None
 
+        # Worker processes kept alive for optimization
+        self.optimization_runner = None
+
     def init_engine(self):
         """"""
         self.write_log("初始化CTA回测引擎")
@@ -282,15 +289,20 @@ class BacktesterEngine(BaseEngine):
             {}
         )
 
+        if not self.optimization_runner:
+            self.optimization_runner = OptimizationRunner()
+
         if use_ga:
             self.result_values = engine.run_ga_optimization(
                 optimization_setting,
-                output=False
+                output=False,
+                runner=self.optimization_runner
             )
         else:
             self.result_values = engine.run_optimization(
                 optimization_setting,
-                output=False
+                output=False,
+                runner=self.optimization_runner
             )
 
         # Clear thread object handler.
@@ -344,6 +356,19 @@ class BacktesterEngine(BaseEngine):
 
         return True
 
+    def stop_optimization(self) -> None:
+        """
+        Cancel running multiprocessing optimization.
+        """
+        if self.optimization_runner:
+            self.optimization_runner.cancel()
+
+    def close(self) -> None:
+        """"""
+        if self.optimization_runner:
+            self.optimization_runner.close()
+            self.optimization_runner = None
+
     def run_downloading(
         self,
         vt_symbol: str,
@@ -386,6 +411,9 @@ class BacktesterEngine(BaseEngine):
             if data:
                 database_manager.save_bar_data(data)
                 self.write_log(f"{vt_symbol}-{interval}历史数据下载完成")
+
+                if self.optimization_runner:
+                    self.optimization_runner.clear_history()
             else:
                 self.write_log(f"数据下载失败，无法获取{vt_symbol}的历史数据")
         except Exception:
@@ -1,11 +1,23 @@
-from collections import defaultdict
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, deque
 from datetime import date, datetime, timedelta
 from typing import Callable
 from itertools import product
 from functools import lru_cache
+from heapq import heappush, heappushpop
+from operator import attrgetter
+from queue import Queue
+from threading import Event
 from time import time
+import hashlib
+import inspect
 import multiprocessing
+import os
+import pickle
 import random
+import shutil
+import sqlite3
+import tempfile
 import traceback
 
 import numpy as np
@@ -17,8 +29,11 @@ from deap import creator, base, tools, algorithms
 from vnpy.trader.constant import (Direction, Offset, Exchange,
                                   Interval, Status)
 from vnpy.trader.database import database_manager
+from vnpy.trader.database.database import DB_TZ
 from vnpy.trader.object import OrderData, TradeData, BarData, TickData
-from vnpy.trader.utility import round_to
+from vnpy.trader.columnar import BarHistory, TickHistory, ColumnarHistory
+from vnpy.trader.fill_model import FillModel
+from vnpy.trader.utility import round_to, get_file_path
 
 from .base import (
     BacktestingMode,
@@ -98,6 +113,518 @@ class OptimizationSetting:
         return settings_ga
 
 
+class OptimizationCache:
+    """
+    Target values of optimization stored in sqlite database on disk,
+    so that identical backtesting is not run again in later sessions.
+    """
+
+    def __init__(self, filename: str = "cta_optimization_cache.db"):
+        """"""
+        path = get_file_path(filename)
+
+        self.connection = sqlite3.connect(
+            str(path), timeout=30, check_same_thread=False
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS result (key TEXT PRIMARY KEY, value REAL)"
+        )
+        self.connection.commit()
+
+    def get(self, keys: list) -> dict:
+        """
+        Get cached values of keys, keys not found are not included.
+        """
+        data = {}
+
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor = self.connection.execute(
+                f"SELECT key, value FROM result WHERE key IN ({placeholders})",
+                chunk
+            )
+
+            # NaN value is saved as NULL by sqlite
+            for key, value in cursor:
+                data[key] = value if value is not None else float("nan")
+
+        return data
+
+    def set(self, data: dict) -> None:
+        """
+        Save values into cache.
+        """
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO result (key, value) VALUES (?, ?)",
+            [(key, float(value)) for key, value in data.items()]
+        )
+        self.connection.commit()
+
+    def close(self) -> None:
+        """"""
+        self.connection.close()
+
+
+def get_cache_prefix(
+    engine: "BacktestingEngine",
+    history_data: ColumnarHistory,
+    target_name: str
+) -> str:
+    """
+    Generate cache key prefix from strategy source code, history data range
+    and backtesting parameters.
+    """
+    strategy_class = engine.strategy_class
+    try:
+        source = inspect.getsource(strategy_class)
+    except (OSError, TypeError):
+        source = f"{strategy_class.__module__}.{strategy_class.__qualname__}"
+
+    dts = history_data.array["datetime"]
+
+    items = [
+        hashlib.md5(source.encode()).hexdigest(),
+        engine.vt_symbol,
+        engine.interval,
+        engine.mode,
+        dts[0],
+        dts[-1],
+        len(dts),
+        engine.rate,
+        engine.slippage,
+        engine.size,
+        engine.pricetick,
+        engine.capital,
+        engine.inverse,
+        engine.fill_model,
+        target_name
+    ]
+    text = "|".join([str(i) for i in items])
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+class OptimizationRunner:
+    """
+    Run optimization with a pool of worker processes kept alive across
+    optimization runs.
+
+    History data is loaded once for every backtesting range and shared
+    with workers through memory mapped files. Results are streamed back
+    as soon as each backtesting finishes, with progress and ETA output.
+    """
+
+    def __init__(self, max_workers: int = 0):
+        """"""
+        self.max_workers: int = max_workers or multiprocessing.cpu_count()
+
+        self.pool = None
+        self.temp_dir: str = tempfile.mkdtemp(prefix="vnpy_optimization_")
+        self.history_cache: dict = {}
+
+        self.cancelled: Event = Event()
+        self.cache: OptimizationCache = None
+
+    def get_pool(self):
+        """
+        Create worker pool when first used.
+        """
+        if not self.pool:
+            # Force to use spawn method to create new process (instead of fork on Linux)
+            ctx = multiprocessing.get_context("spawn")
+            self.pool = ctx.Pool(self.max_workers)
+        return self.pool
+
+    def get_history(self, engine: "BacktestingEngine"):
+        """
+        Get shared history data for backtesting range of engine.
+        """
+        key = (
+            engine.vt_symbol,
+            engine.interval,
+            engine.mode,
+            engine.start,
+            engine.end
+        )
+
+        history_data = self.history_cache.get(key, None)
+        if not history_data:
+            history_data = engine.create_shared_history(self.temp_dir)
+            if history_data:
+                self.history_cache[key] = history_data
+
+        return history_data
+
+    def run(
+        self,
+        engine: "BacktestingEngine",
+        optimization_setting: OptimizationSetting,
+        top_k: int = 0,
+        callback: Callable = None
+    ):
+        """
+        Run backtesting of all settings and return results sorted by
+        target value.
+
+        If top_k is larger than 0, only results with top_k highest target
+        values are kept in memory. Callback is called with (result,
+        finished count, total count) every time a backtesting finishes.
+        """
+        # Get optimization setting and target
+        settings = optimization_setting.generate_setting()
+        target_name = optimization_setting.target_name
+
+        if not settings:
+            engine.output("优化参数组合为空，请检查")
+            return
+
+        if not target_name:
+            engine.output("优化目标未设置，请检查")
+            return
+
+        # Load history data only once, and share it with all worker
+        # processes through memory mapped file.
+        history_data = self.get_history(engine)
+        if not history_data:
+            engine.output("历史数据为空，无法优化")
+            return
+
+        pool = self.get_pool()
+        self.cancelled.clear()
+
+        # Only a limited number of tasks are submitted into pool at the
+        # same time, so that cancel can take effect quickly.
+        result_queue = Queue()
+        setting_iter = iter(settings)
+        running = 0
+
+        def submit() -> bool:
+            setting = next(setting_iter, None)
+            if setting is None:
+                return False
+
+            pool.apply_async(
+                optimize,
+                (
+                    target_name,
+                    engine.strategy_class,
+                    setting,
+                    engine.vt_symbol,
+                    engine.interval,
+                    engine.start,
+                    engine.rate,
+                    engine.slippage,
+                    engine.size,
+                    engine.pricetick,
+                    engine.capital,
+                    engine.end,
+                    engine.mode,
+                    engine.inverse,
+                    history_data,
+                    engine.fill_model
+                ),
+                callback=result_queue.put,
+                error_callback=result_queue.put
+            )
+            return True
+
+        for _ in range(self.max_workers * 2):
+            if submit():
+                running += 1
+
+        total = len(settings)
+        finished = 0
+        last_percent = 0
+        start = time()
+
+        result_heap = []
+        result_values = []
+
+        while running:
+            result = result_queue.get()
+            running -= 1
+            finished += 1
+
+            if isinstance(result, BaseException):
+                engine.output(f"参数优化回测触发异常：{repr(result)}")
+            elif top_k:
+                # Use finished count to avoid comparing statistics dict
+                item = (result[1], -finished, result)
+                if len(result_heap) < top_k:
+                    heappush(result_heap, item)
+                else:
+                    heappushpop(result_heap, item)
+            else:
+                result_values.append(result)
+
+            if callback:
+                callback(result, finished, total)
+
+            percent = int(finished * 100 / total)
+            if percent > last_percent:
+                last_percent = percent
+                eta = (time() - start) / finished * (total - finished)
+                engine.output(
+                    f"优化进度：{finished}/{total} [{percent}%]，预计剩余{eta:.0f}秒"
+                )
+
+            if not self.cancelled.is_set() and submit():
+                running += 1
+
+        if self.cancelled.is_set():
+            engine.output(f"参数优化已取消，完成数量：{finished}/{total}")
+
+        if top_k:
+            result_values = [item[2] for item in result_heap]
+
+        result_values.sort(reverse=True, key=lambda result: result[1])
+        return result_values
+
+    def run_ga(
+        self,
+        engine: "BacktestingEngine",
+        optimization_setting: OptimizationSetting,
+        population_size: int = 100,
+        ngen_size: int = 30
+    ):
+        """
+        Run genetic algorithm optimization.
+
+        Every generation is evaluated in worker processes, with target
+        values of parameters backtested before (by any run) read from
+        cache on disk. State of the run is saved after each generation,
+        and an interrupted run is resumed when started again with the
+        same setting.
+        """
+        # Get optimization setting and target
+        settings = optimization_setting.generate_setting_ga()
+        target_name = optimization_setting.target_name
+
+        if not settings:
+            engine.output("优化参数组合为空，请检查")
+            return
+
+        if not target_name:
+            engine.output("优化目标未设置，请检查")
+            return
+
+        history_data = self.get_history(engine)
+        if not history_data:
+            engine.output("历史数据为空，无法优化")
+            return
+
+        if not self.cache:
+            self.cache = OptimizationCache()
+
+        self.cancelled.clear()
+        prefix = get_cache_prefix(engine, history_data, target_name)
+
+        # Define parameter generation function
+        def generate_parameter():
+            """"""
+            return random.choice(settings)
+
+        def mutate_individual(individual, indpb):
+            """"""
+            size = len(individual)
+            paramlist = generate_parameter()
+            for i in range(size):
+                if random.random() < indpb:
+                    individual[i] = paramlist[i]
+            return individual,
+
+        def evaluate_population(population) -> None:
+            """
+            Evaluate individuals without valid fitness, using cache first.
+            """
+            invalid = [ind for ind in population if not ind.fitness.valid]
+            keys = {tuple(ind): f"{prefix}|{tuple(ind)}" for ind in invalid}
+
+            values = self.cache.get(list(set(keys.values())))
+            missing = [p for p, key in keys.items() if key not in values]
+
+            if missing:
+                args = [
+                    (
+                        target_name,
+                        engine.strategy_class,
+                        dict(p),
+                        engine.vt_symbol,
+                        engine.interval,
+                        engine.start,
+                        engine.rate,
+                        engine.slippage,
+                        engine.size,
+                        engine.pricetick,
+                        engine.capital,
+                        engine.end,
+                        engine.mode,
+                        engine.inverse,
+                        history_data,
+                        engine.fill_model
+                    )
+                    for p in missing
+                ]
+                results = self.get_pool().starmap(optimize, args)
+
+                new_values = {keys[p]: r[1] for p, r in zip(missing, results)}
+                self.cache.set(new_values)
+                values.update(new_values)
+
+            for ind in invalid:
+                ind.fitness.values = (values[keys[tuple(ind)]],)
+
+            return len(keys), len(missing)
+
+        # Set up genetic algorithem
+        toolbox = base.Toolbox()
+        toolbox.register("individual", tools.initIterate, creator.Individual, generate_parameter)
+        toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+        toolbox.register("mate", tools.cxTwoPoint)
+        toolbox.register("mutate", mutate_individual, indpb=1)
+        toolbox.register("select", tools.selNSGA2)
+
+        total_size = len(settings)
+        pop_size = population_size                      # number of individuals in each generation
+        lambda_ = pop_size                              # number of children to produce at each generation
+        mu = int(pop_size * 0.8)                        # number of individuals to select for the next generation
+
+        cxpb = 0.95         # probability that an offspring is produced by crossover
+        mutpb = 1 - cxpb    # probability that an offspring is produced by mutation
+        ngen = ngen_size    # number of generation
+
+        self.output_ga_setting(engine, total_size, pop_size, mu, ngen, cxpb, mutpb)
+
+        # Resume from checkpoint saved by interrupted run
+        run_key = f"{prefix}|{settings}|{pop_size}|{ngen}"
+        run_id = hashlib.md5(run_key.encode()).hexdigest()
+        checkpoint_path = get_file_path(f"cta_ga_{run_id}.pkl")
+
+        def save_checkpoint(gen, pop, hof) -> None:
+            """"""
+            with open(checkpoint_path, "wb") as f:
+                pickle.dump(
+                    {
+                        "generation": gen,
+                        "population": pop,
+                        "halloffame": hof,
+                        "random_state": random.getstate()
+                    },
+                    f
+                )
+
+        if checkpoint_path.exists():
+            with open(checkpoint_path, "rb") as f:
+                checkpoint = pickle.load(f)
+
+            start_gen = checkpoint["generation"] + 1
+            pop = checkpoint["population"]
+            hof = checkpoint["halloffame"]
+            random.setstate(checkpoint["random_state"])
+
+            engine.output(f"从第{start_gen}代恢复遗传算法优化")
+        else:
+            start_gen = 1
+            pop = toolbox.population(pop_size)
+            hof = tools.ParetoFront()               # end result of pareto front
+
+            evaluate_population(pop)
+            hof.update(pop)
+            save_checkpoint(0, pop, hof)
+
+        start = time()
+
+        for gen in range(start_gen, ngen + 1):
+            if self.cancelled.is_set():
+                engine.output(f"遗传算法优化已取消，进度保存于第{gen - 1}代")
+                break
+
+            offspring = algorithms.varOr(pop, toolbox, lambda_, cxpb, mutpb)
+            count, missing = evaluate_population(offspring)
+
+            hof.update(offspring)
+            pop[:] = toolbox.select(pop + offspring, mu)
+
+            best = max([ind.fitness.values[0] for ind in pop])
+            engine.output(
+                f"第{gen}代完成，评估数量：{count}，实际回测：{missing}，当前最优：{best}"
+            )
+
+            save_checkpoint(gen, pop, hof)
+        else:
+            if checkpoint_path.exists():
+                checkpoint_path.unlink()
+
+        end = time()
+        cost = int((end - start))
+
+        engine.output(f"遗传算法优化完成，耗时{cost}秒")
+
+        # Return result list
+        results = []
+
+        for parameter_values in hof:
+            setting = dict(parameter_values)
+            target_value = parameter_values.fitness.values[0]
+            results.append((setting, target_value, {}))
+
+        return results
+
+    def output_ga_setting(
+        self,
+        engine: "BacktestingEngine",
+        total_size: int,
+        pop_size: int,
+        mu: int,
+        ngen: int,
+        cxpb: float,
+        mutpb: float
+    ) -> None:
+        """"""
+        engine.output(f"参数优化空间：{total_size}")
+        engine.output(f"每代族群总数：{pop_size}")
+        engine.output(f"优良筛选个数：{mu}")
+        engine.output(f"迭代次数：{ngen}")
+        engine.output(f"交叉概率：{cxpb:.0%}")
+        engine.output(f"突变概率：{mutpb:.0%}")
+
+    def cancel(self) -> None:
+        """
+        Stop submitting new backtesting, running ones will still finish.
+        Genetic algorithm optimization stops after current generation.
+        """
+        self.cancelled.set()
+
+    def clear_history(self) -> None:
+        """
+        Release shared history data cached.
+        """
+        filenames = [h._filename for h in self.history_cache.values()]
+        self.history_cache.clear()
+
+        for filename in filenames:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """
+        Stop worker processes and remove temp files.
+        """
+        if self.pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+        self.history_cache.clear()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+
+
 class BacktestingEngine:
     """"""
 
@@ -118,6 +645,7 @@ class BacktestingEngine:
         self.capital = 1_000_000
         self.mode = BacktestingMode.BAR
         self.inverse = False
+        self.columnar = False
 
         self.strategy_class = None
         self.strategy = None
@@ -138,6 +666,17 @@ class BacktestingEngine:
         self.limit_orders = {}
         self.active_limit_orders = {}
 
+        # Active orders of each side sorted by (price, count, orderid),
+        # and limit orders not yet pushed to strategy
+        self.long_stop_orders = []
+        self.short_stop_orders = []
+        self.long_limit_orders = []
+        self.short_limit_orders = []
+        self.submitting_orders = []
+
+        self.fill_model = FillModel()
+        self.cancel_requests = deque()  # (arrive time, vt_orderid)
+
         self.trade_count = 0
         self.trades = {}
 
@@ -163,6 +702,15 @@ class BacktestingEngine:
         self.limit_orders.clear()
         self.active_limit_orders.clear()
 
+        self.long_stop_orders.clear()
+        self.short_stop_orders.clear()
+        self.long_limit_orders.clear()
+        self.short_limit_orders.clear()
+        self.submitting_orders.clear()
+
+        self.fill_model.clear()
+        self.cancel_requests.clear()
+
         self.trade_count = 0
         self.trades.clear()
 
@@ -181,9 +729,18 @@ class BacktestingEngine:
         capital: int = 0,
         end: datetime = None,
         mode: BacktestingMode = BacktestingMode.BAR,
-        inverse: bool = False
+        inverse: bool = False,
+        columnar: bool = False,
+        fill_model: FillModel = None
     ):
-        """"""
+        """
+        If columnar is True, history data is stored in NumPy columns
+        and data objects are only created during replay, which uses much
+        less memory for long tick history.
+
+        Limit orders in tick mode are matched by fill_model, default
+        one fills the whole order once its price crosses best price.
+        """
         self.mode = mode
         self.vt_symbol = vt_symbol
         self.interval = Interval(interval)
@@ -200,6 +757,9 @@ class BacktestingEngine:
         self.end = end
         self.mode = mode
         self.inverse = inverse
+        self.columnar = columnar
+        self.fill_model = fill_model or FillModel()
+        self.fill_model.clear()
 
     def add_strategy(self, strategy_class: type, setting: dict):
         """"""
@@ -219,7 +779,15 @@ class BacktestingEngine:
             self.output("起始日期必须小于结束日期")
             return
 
-        self.history_data.clear()       # Clear previously loaded history data
+        # Clear previously loaded history data
+        if not self.columnar:
+            self.history_data.clear()
+        elif self.mode == BacktestingMode.BAR:
+            self.history_data = BarHistory(
+                self.symbol, self.exchange, self.interval, tz=DB_TZ
+            )
+        else:
+            self.history_data = TickHistory(self.symbol, self.exchange, tz=DB_TZ)
 
         # Load 30 days of data each time and allow for progress update
         progress_delta = timedelta(days=30)
@@ -233,23 +801,46 @@ class BacktestingEngine:
         while start < self.end:
             end = min(end, self.end)  # Make sure end time stays within set range
 
+            # Data is loaded as arrays directly in columnar mode,
+            # without creating and caching data objects.
             if self.mode == BacktestingMode.BAR:
-                data = load_bar_data(
-                    self.symbol,
-                    self.exchange,
-                    self.interval,
-                    start,
-                    end
-                )
+                if self.columnar:
+                    self.history_data.extend_array(
+                        database_manager.load_bar_array(
+                            self.symbol,
+                            self.exchange,
+                            self.interval,
+                            start,
+                            end
+                        )
+                    )
+                else:
+                    data = load_bar_data(
+                        self.symbol,
+                        self.exchange,
+                        self.interval,
+                        start,
+                        end
+                    )
+                    self.history_data.extend(data)
             else:
-                data = load_tick_data(
-                    self.symbol,
-                    self.exchange,
-                    start,
-                    end
-                )
-
-            self.history_data.extend(data)
+                if self.columnar:
+                    self.history_data.extend_array(
+                        database_manager.load_tick_array(
+                            self.symbol,
+                            self.exchange,
+                            start,
+                            end
+                        )
+                    )
+                else:
+                    data = load_tick_data(
+                        self.symbol,
+                        self.exchange,
+                        start,
+                        end
+                    )
+                    self.history_data.extend(data)
 
             progress += progress_delta / total_delta
             progress = min(progress, 1)
@@ -307,36 +898,49 @@ class BacktestingEngine:
 
         self.output("历史数据回放结束")
 
-    def calculate_result(self):
-        """"""
+    def calculate_result(self, vectorized: bool = True):
+        """
+        Calculate daily mark-to-market pnl. By default trade related pnl
+        is calculated with NumPy arrays instead of looping over trades.
+        """
         self.output("开始计算逐日盯市盈亏")
 
         if not self.trades:
             self.output("成交记录为空，无法计算")
             return
 
-        # Add trade data into daily reuslt.
-        for trade in self.trades.values():
-            d = trade.datetime.date()
-            daily_result = self.daily_results[d]
-            daily_result.add_trade(trade)
-
-        # Calculate daily result by iteration.
-        pre_close = 0
-        start_pos = 0
-
-        for daily_result in self.daily_results.values():
-            daily_result.calculate_pnl(
-                pre_close,
-                start_pos,
+        if vectorized:
+            calculate_daily_results(
+                list(self.daily_results.values()),
+                list(self.trades.values()),
                 self.size,
                 self.rate,
                 self.slippage,
                 self.inverse
             )
+        else:
+            # Add trade data into daily reuslt.
+            for trade in self.trades.values():
+                d = trade.datetime.date()
+                daily_result = self.daily_results[d]
+                daily_result.add_trade(trade)
+
+            # Calculate daily result by iteration.
+            pre_close = 0
+            start_pos = 0
+
+            for daily_result in self.daily_results.values():
+                daily_result.calculate_pnl(
+                    pre_close,
+                    start_pos,
+                    self.size,
+                    self.rate,
+                    self.slippage,
+                    self.inverse
+                )
 
-            pre_close = daily_result.close_price
-            start_pos = daily_result.end_pos
+                pre_close = daily_result.close_price
+                start_pos = daily_result.end_pos
 
         # Generate dataframe
         results = defaultdict(list)
@@ -559,186 +1163,98 @@ class BacktestingEngine:
         fig.update_layout(height=1000, width=1000)
         fig.show()
 
-    def run_optimization(self, optimization_setting: OptimizationSetting, output=True):
-        """"""
-        # Get optimization setting and target
-        settings = optimization_setting.generate_setting()
-        target_name = optimization_setting.target_name
-
-        if not settings:
-            self.output("优化参数组合为空，请检查")
-            return
-
-        if not target_name:
-            self.output("优化目标未设置，请检查")
-            return
-
-        # Use multiprocessing pool for running backtesting with different setting
-        # Force to use spawn method to create new process (instead of fork on Linux)
-        ctx = multiprocessing.get_context("spawn")
-        pool = ctx.Pool(multiprocessing.cpu_count())
-
-        results = []
-        for setting in settings:
-            result = (pool.apply_async(optimize, (
-                target_name,
-                self.strategy_class,
-                setting,
-                self.vt_symbol,
-                self.interval,
-                self.start,
-                self.rate,
-                self.slippage,
-                self.size,
-                self.pricetick,
-                self.capital,
-                self.end,
-                self.mode,
-                self.inverse
-            )))
-            results.append(result)
-
-        pool.close()
-        pool.join()
-
-        # Sort results and output
-        result_values = [result.get() for result in results]
-        result_values.sort(reverse=True, key=lambda result: result[1])
+    def run_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        output=True,
+        runner: "OptimizationRunner" = None,
+        top_k: int = 0
+    ):
+        """
+        Run optimization with multiprocessing pool. A persistent runner
+        can be passed in to reuse its worker processes and history data.
+        """
+        if runner:
+            result_values = runner.run(self, optimization_setting, top_k)
+        else:
+            runner = OptimizationRunner()
+            try:
+                result_values = runner.run(self, optimization_setting, top_k)
+            finally:
+                runner.close()
 
-        if output:
+        if output and result_values:
             for value in result_values:
                 msg = f"参数：{value[0]}, 目标：{value[1]}"
                 self.output(msg)
 
         return result_values
 
-    def run_ga_optimization(self, optimization_setting: OptimizationSetting, population_size=100, ngen_size=30, output=True):
-        """"""
-        # Get optimization setting and target
-        settings = optimization_setting.generate_setting_ga()
-        target_name = optimization_setting.target_name
-
-        if not settings:
-            self.output("优化参数组合为空，请检查")
-            return
-
-        if not target_name:
-            self.output("优化目标未设置，请检查")
-            return
-
-        # Define parameter generation function
-        def generate_parameter():
-            """"""
-            return random.choice(settings)
-
-        def mutate_individual(individual, indpb):
-            """"""
-            size = len(individual)
-            paramlist = generate_parameter()
-            for i in range(size):
-                if random.random() < indpb:
-                    individual[i] = paramlist[i]
-            return individual,
-
-        # Create ga object function
-        global ga_target_name
-        global ga_strategy_class
-        global ga_setting
-        global ga_vt_symbol
-        global ga_interval
-        global ga_start
-        global ga_rate
-        global ga_slippage
-        global ga_size
-        global ga_pricetick
-        global ga_capital
-        global ga_end
-        global ga_mode
-        global ga_inverse
-
-        ga_target_name = target_name
-        ga_strategy_class = self.strategy_class
-        ga_setting = settings[0]
-        ga_vt_symbol = self.vt_symbol
-        ga_interval = self.interval
-        ga_start = self.start
-        ga_rate = self.rate
-        ga_slippage = self.slippage
-        ga_size = self.size
-        ga_pricetick = self.pricetick
-        ga_capital = self.capital
-        ga_end = self.end
-        ga_mode = self.mode
-        ga_inverse = self.inverse
-
-        # Set up genetic algorithem
-        toolbox = base.Toolbox()
-        toolbox.register("individual", tools.initIterate, creator.Individual, generate_parameter)
-        toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-        toolbox.register("mate", tools.cxTwoPoint)
-        toolbox.register("mutate", mutate_individual, indpb=1)
-        toolbox.register("evaluate", ga_optimize)
-        toolbox.register("select", tools.selNSGA2)
-
-        total_size = len(settings)
-        pop_size = population_size                      # number of individuals in each generation
-        lambda_ = pop_size                              # number of children to produce at each generation
-        mu = int(pop_size * 0.8)                        # number of individuals to select for the next generation
-
-        cxpb = 0.95         # probability that an offspring is produced by crossover
-        mutpb = 1 - cxpb    # probability that an offspring is produced by mutation
-        ngen = ngen_size    # number of generation
+    def run_ga_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        population_size=100,
+        ngen_size=30,
+        output=True,
+        runner: "OptimizationRunner" = None
+    ):
+        """
+        Run genetic algorithm optimization, individuals are evaluated in
+        worker processes of runner and target values are cached on disk.
+        """
+        if runner:
+            results = runner.run_ga(
+                self, optimization_setting, population_size, ngen_size
+            )
+        else:
+            runner = OptimizationRunner()
+            try:
+                results = runner.run_ga(
+                    self, optimization_setting, population_size, ngen_size
+                )
+            finally:
+                runner.close()
 
-        pop = toolbox.population(pop_size)
-        hof = tools.ParetoFront()               # end result of pareto front
+        if output and results:
+            for value in results:
+                msg = f"参数：{value[0]}, 目标：{value[1]}"
+                self.output(msg)
 
-        stats = tools.Statistics(lambda ind: ind.fitness.values)
-        np.set_printoptions(suppress=True)
-        stats.register("mean", np.mean, axis=0)
-        stats.register("std", np.std, axis=0)
-        stats.register("min", np.min, axis=0)
-        stats.register("max", np.max, axis=0)
+        return results
 
-        # Multiprocessing is not supported yet.
-        # pool = multiprocessing.Pool(multiprocessing.cpu_count())
-        # toolbox.register("map", pool.map)
+    def create_shared_history(self, temp_dir: str) -> ColumnarHistory:
+        """
+        Create memory mapped columnar history under temp_dir, reusing
+        history data already loaded if any.
+        """
+        if isinstance(self.history_data, ColumnarHistory) and len(self.history_data):
+            history_data = self.history_data
+        elif self.history_data:
+            if self.mode == BacktestingMode.BAR:
+                history_data = BarHistory(self.symbol, self.exchange, self.interval)
+            else:
+                history_data = TickHistory(self.symbol, self.exchange)
+            history_data.extend(self.history_data)
+        else:
+            columnar = self.columnar
+            self.columnar = True
+            self.load_data()
+            self.columnar = columnar
 
-        # Run ga optimization
-        self.output(f"参数优化空间：{total_size}")
-        self.output(f"每代族群总数：{pop_size}")
-        self.output(f"优良筛选个数：{mu}")
-        self.output(f"迭代次数：{ngen}")
-        self.output(f"交叉概率：{cxpb:.0%}")
-        self.output(f"突变概率：{mutpb:.0%}")
+            history_data = self.history_data
+            self.history_data = []
 
-        start = time()
+        if not history_data:
+            return None
 
-        algorithms.eaMuPlusLambda(
-            pop,
-            toolbox,
-            mu,
-            lambda_,
-            cxpb,
-            mutpb,
-            ngen,
-            stats,
-            halloffame=hof
+        fd, path = tempfile.mkstemp(
+            suffix=".npy",
+            prefix=f"{self.vt_symbol}_{self.mode.name}_",
+            dir=temp_dir
         )
+        os.close(fd)
 
-        end = time()
-        cost = int((end - start))
-
-        self.output(f"遗传算法优化完成，耗时{cost}秒")
-
-        # Return result list
-        results = []
-
-        for parameter_values in hof:
-            setting = dict(parameter_values)
-            target_value = ga_optimize(parameter_values)[0]
-            results.append((setting, target_value, {}))
-
-        return results
+        return history_data.to_mmap(path)
 
     def update_daily_close(self, price: float):
         """"""
@@ -775,6 +1291,9 @@ class BacktestingEngine:
     def cross_limit_order(self):
         """
         Cross limit order with last bar/tick data.
+
+        In tick mode, orders are matched by fill model, which may also
+        simulate latency and partial fill.
         """
         if self.mode == BacktestingMode.BAR:
             long_cross_price = self.bar.low_price
@@ -782,49 +1301,105 @@ class BacktestingEngine:
             long_best_price = self.bar.open_price
             short_best_price = self.bar.open_price
         else:
-            long_cross_price = self.tick.ask_price_1
-            short_cross_price = self.tick.bid_price_1
-            long_best_price = long_cross_price
-            short_best_price = short_cross_price
+            fill_model = self.fill_model
+            fill_model.update_tick(self.tick)
+            self.process_cancel_requests()
+
+            long_cross_price = fill_model.get_long_bound()
+            short_cross_price = fill_model.get_short_bound()
+
+        # Only visit orders can be filled and orders not yet pushed,
+        # in the order of orders sent
+        orders = {}
+
+        if long_cross_price > 0:
+            ix = bisect_left(self.long_limit_orders, (long_cross_price,))
+            for _, count, vt_orderid in self.long_limit_orders[ix:]:
+                orders[count] = vt_orderid
+
+        if short_cross_price > 0:
+            ix = bisect_right(self.short_limit_orders, (short_cross_price, float("inf")))
+            for _, count, vt_orderid in self.short_limit_orders[:ix]:
+                orders[count] = vt_orderid
+
+        for count, vt_orderid in self.submitting_orders:
+            orders[count] = vt_orderid
+        self.submitting_orders = []
+
+        for count in sorted(orders.keys()):
+            # Order may be cancelled by callback of strategy
+            order = self.active_limit_orders.get(orders[count], None)
+            if not order:
+                continue
 
-        for order in list(self.active_limit_orders.values()):
-            # Push order update with status "not traded" (pending).
             if order.status == Status.SUBMITTING:
+                # Order not arrived at exchange yet
+                if (
+                    self.mode == BacktestingMode.TICK
+                    and order.datetime + fill_model.latency > self.datetime
+                ):
+                    self.submitting_orders.append((count, order.vt_orderid))
+                    continue
+
+                # Push order update with status "not traded" (pending).
                 order.status = Status.NOTTRADED
                 self.strategy.on_order(order)
 
+                if self.mode == BacktestingMode.TICK:
+                    fill_model.add_order(order.vt_orderid, order.direction, order.price)
+
             # Check whether limit orders can be filled.
-            long_cross = (
-                order.direction == Direction.LONG
-                and order.price >= long_cross_price
-                and long_cross_price > 0
-            )
+            if self.mode == BacktestingMode.BAR:
+                long_cross = (
+                    order.direction == Direction.LONG
+                    and order.price >= long_cross_price
+                    and long_cross_price > 0
+                )
 
-            short_cross = (
-                order.direction == Direction.SHORT
-                and order.price <= short_cross_price
-                and short_cross_price > 0
-            )
+                short_cross = (
+                    order.direction == Direction.SHORT
+                    and order.price <= short_cross_price
+                    and short_cross_price > 0
+                )
 
-            if not long_cross and not short_cross:
-                continue
+                if long_cross:
+                    trade_price = min(order.price, long_best_price)
+                elif short_cross:
+                    trade_price = max(order.price, short_best_price)
+                else:
+                    continue
 
-            # Push order udpate with status "all traded" (filled).
-            order.traded = order.volume
-            order.status = Status.ALLTRADED
+                volume = order.volume - order.traded
+            else:
+                trade_price, volume = fill_model.match_order(
+                    order.vt_orderid,
+                    order.direction,
+                    order.price,
+                    order.volume - order.traded
+                )
+
+                if not volume:
+                    continue
+
+            # Push order udpate with status "all traded" (filled) or
+            # "part traded".
+            order.traded += volume
+            if order.traded < order.volume:
+                order.status = Status.PARTTRADED
+            else:
+                order.status = Status.ALLTRADED
             self.strategy.on_order(order)
 
-            self.active_limit_orders.pop(order.vt_orderid)
+            if order.status == Status.ALLTRADED:
+                self.remove_limit_order(order)
 
             # Push trade update
             self.trade_count += 1
 
-            if long_cross:
-                trade_price = min(order.price, long_best_price)
-                pos_change = order.volume
+            if order.direction == Direction.LONG:
+                pos_change = volume
             else:
-                trade_price = max(order.price, short_best_price)
-                pos_change = -order.volume
+                pos_change = -volume
 
             trade = TradeData(
                 symbol=order.symbol,
@@ -834,7 +1409,7 @@ class BacktestingEngine:
                 direction=order.direction,
                 offset=order.offset,
                 price=trade_price,
-                volume=order.volume,
+                volume=volume,
                 datetime=self.datetime,
                 gateway_name=self.gateway_name,
             )
@@ -844,10 +1419,23 @@ class BacktestingEngine:
 
             self.trades[trade.vt_tradeid] = trade
 
+    def process_cancel_requests(self):
+        """
+        Cancel orders with cancel request arrived at exchange.
+        """
+        cancel_requests = self.cancel_requests
+
+        while cancel_requests and cancel_requests[0][0] <= self.datetime:
+            _, vt_orderid = cancel_requests.popleft()
+            self.process_cancel(vt_orderid)
+
     def cross_stop_order(self):
         """
         Cross stop order with last bar/tick data.
         """
+        if not self.active_stop_orders:
+            return
+
         if self.mode == BacktestingMode.BAR:
             long_cross_price = self.bar.high_price
             short_cross_price = self.bar.low_price
@@ -859,7 +1447,24 @@ class BacktestingEngine:
             long_best_price = long_cross_price
             short_best_price = short_cross_price
 
-        for stop_order in list(self.active_stop_orders.values()):
+        # Only visit stop orders can be triggered, in the order of stop
+        # orders sent
+        stop_orders = []
+
+        ix = bisect_right(self.long_stop_orders, (long_cross_price, float("inf")))
+        stop_orders.extend(self.long_stop_orders[:ix])
+
+        ix = bisect_left(self.short_stop_orders, (short_cross_price,))
+        stop_orders.extend(self.short_stop_orders[ix:])
+
+        stop_orders.sort(key=lambda item: item[1])
+
+        for _, _, stop_orderid in stop_orders:
+            # Stop order may be cancelled by callback of strategy
+            stop_order = self.active_stop_orders.get(stop_orderid, None)
+            if not stop_order:
+                continue
+
             # Check whether stop order can be triggered.
             long_cross = (
                 stop_order.direction == Direction.LONG
@@ -921,8 +1526,7 @@ class BacktestingEngine:
             stop_order.vt_orderids.append(order.vt_orderid)
             stop_order.status = StopOrderStatus.TRIGGERED
 
-            if stop_order.stop_orderid in self.active_stop_orders:
-                self.active_stop_orders.pop(stop_order.stop_orderid)
+            self.remove_stop_order(stop_order)
 
             # Push update to strategy.
             self.strategy.on_stop_order(stop_order)
@@ -989,6 +1593,12 @@ class BacktestingEngine:
         self.active_stop_orders[stop_order.stop_orderid] = stop_order
         self.stop_orders[stop_order.stop_orderid] = stop_order
 
+        if direction == Direction.LONG:
+            book = self.long_stop_orders
+        else:
+            book = self.short_stop_orders
+        insort(book, (price, self.stop_order_count, stop_order.stop_orderid))
+
         return stop_order.stop_orderid
 
     def send_limit_order(
@@ -1017,6 +1627,14 @@ class BacktestingEngine:
         self.active_limit_orders[order.vt_orderid] = order
         self.limit_orders[order.vt_orderid] = order
 
+        if direction == Direction.LONG:
+            book = self.long_limit_orders
+        else:
+            book = self.short_limit_orders
+        insort(book, (price, self.limit_order_count, order.vt_orderid))
+
+        self.submitting_orders.append((self.limit_order_count, order.vt_orderid))
+
         return order.vt_orderid
 
     def cancel_order(self, strategy: CtaTemplate, vt_orderid: str):
@@ -1032,7 +1650,8 @@ class BacktestingEngine:
         """"""
         if vt_orderid not in self.active_stop_orders:
             return
-        stop_order = self.active_stop_orders.pop(vt_orderid)
+        stop_order = self.active_stop_orders[vt_orderid]
+        self.remove_stop_order(stop_order)
 
         stop_order.status = StopOrderStatus.CANCELLED
         self.strategy.on_stop_order(stop_order)
@@ -1041,11 +1660,50 @@ class BacktestingEngine:
         """"""
         if vt_orderid not in self.active_limit_orders:
             return
-        order = self.active_limit_orders.pop(vt_orderid)
+
+        # Order can still be filled before cancel request arrived
+        latency = self.fill_model.latency
+        if self.mode == BacktestingMode.TICK and latency:
+            self.cancel_requests.append((self.datetime + latency, vt_orderid))
+            return
+
+        self.process_cancel(vt_orderid)
+
+    def process_cancel(self, vt_orderid: str):
+        """"""
+        order = self.active_limit_orders.get(vt_orderid, None)
+        if not order:
+            return
+        self.remove_limit_order(order)
 
         order.status = Status.CANCELLED
         self.strategy.on_order(order)
 
+    def remove_limit_order(self, order: OrderData):
+        """
+        Remove limit order from active orders and price sorted list.
+        """
+        self.active_limit_orders.pop(order.vt_orderid)
+        self.fill_model.remove_order(order.vt_orderid)
+
+        if order.direction == Direction.LONG:
+            book = self.long_limit_orders
+        else:
+            book = self.short_limit_orders
+        remove_from_book(book, order.price, order.vt_orderid)
+
+    def remove_stop_order(self, stop_order: StopOrder):
+        """
+        Remove stop order from active stop orders and price sorted list.
+        """
+        self.active_stop_orders.pop(stop_order.stop_orderid)
+
+        if stop_order.direction == Direction.LONG:
+            book = self.long_stop_orders
+        else:
+            book = self.short_stop_orders
+        remove_from_book(book, stop_order.price, stop_order.stop_orderid)
+
     def cancel_all(self, strategy: CtaTemplate):
         """
         Cancel all orders, both limit and stop.
@@ -1208,6 +1866,119 @@ class DailyResult:
         self.net_pnl = self.total_pnl - self.commission - self.slippage
 
 
+def remove_from_book(book: list, price: float, orderid: str) -> None:
+    """
+    Remove order from list of (price, count, orderid) sorted by price.
+    """
+    ix = bisect_left(book, (price,))
+    while ix < len(book) and book[ix][0] == price:
+        if book[ix][2] == orderid:
+            book.pop(ix)
+            return
+        ix += 1
+
+
+def sequential_sum(start: float, values: np.ndarray) -> float:
+    """
+    Sum values one by one from start, in the same order (and so with the
+    same rounding) as adding them in a Python loop.
+    """
+    if not len(values):
+        return start
+    return np.cumsum(np.concatenate(([start], values)))[-1].item()
+
+
+def calculate_daily_results(
+    daily_results: list,
+    trades: list,
+    size: float,
+    rate: float,
+    slippage: float,
+    inverse: bool
+) -> None:
+    """
+    Vectorized version of adding trades into daily results and calling
+    calculate_pnl day by day, with the same results.
+
+    Turnover, commission, slippage and trading pnl of every trade are
+    calculated with NumPy arrays, and only summed up per day in Python.
+    """
+    index_map = {daily_result.date: i for i, daily_result in enumerate(daily_results)}
+
+    dates = map(datetime.date, map(attrgetter("datetime"), trades))
+    day_index = np.array(list(map(index_map.__getitem__, dates)), dtype=np.int64)
+
+    prices = np.array(list(map(attrgetter("price"), trades)))
+    volumes = np.array(list(map(attrgetter("volume"), trades)))
+    directions = np.array(list(map(attrgetter("direction"), trades)), dtype=object)
+    pos_changes = np.where(directions == Direction.LONG, volumes, -volumes)
+
+    closes = np.array([daily_result.close_price for daily_result in daily_results])
+    trade_closes = closes[day_index]
+
+    if not inverse:     # For normal contract
+        turnovers = volumes * size * prices
+        trading_pnls = pos_changes * (trade_closes - prices) * size
+        slippages = volumes * size * slippage
+    else:               # For crypto currency inverse contract
+        turnovers = volumes * size / prices
+        trading_pnls = pos_changes * (1 / prices - 1 / trade_closes) * size
+        slippages = volumes * size * slippage / (prices ** 2)
+
+    commissions = turnovers * rate
+
+    # Group trades by day, keeping original order within each day
+    order = np.argsort(day_index, kind="stable")
+    sorted_trades = [trades[i] for i in order.tolist()]
+    pos_changes = pos_changes[order]
+    turnovers = turnovers[order]
+    trading_pnls = trading_pnls[order]
+    slippages = slippages[order]
+    commissions = commissions[order]
+
+    counts = np.bincount(day_index, minlength=len(daily_results))
+    ends = np.cumsum(counts).tolist()
+    starts = [end - count for end, count in zip(ends, counts.tolist())]
+
+    pre_close = 0
+    start_pos = 0
+
+    for daily_result, start, end in zip(daily_results, starts, ends):
+        daily_result.trades = sorted_trades[start:end]
+        daily_result.trade_count = end - start
+
+        # If no pre_close provided on the first day,
+        # use value 1 to avoid zero division error
+        if pre_close:
+            daily_result.pre_close = pre_close
+        else:
+            daily_result.pre_close = 1
+
+        # Holding pnl is the pnl from holding position at day start
+        daily_result.start_pos = start_pos
+
+        if not inverse:
+            daily_result.holding_pnl = start_pos * \
+                (daily_result.close_price - daily_result.pre_close) * size
+        else:
+            daily_result.holding_pnl = start_pos * \
+                (1 / daily_result.pre_close - 1 / daily_result.close_price) * size
+
+        # Trading pnl is the pnl from new trade during the day
+        daily_result.end_pos = sequential_sum(start_pos, pos_changes[start:end])
+        daily_result.trading_pnl = sequential_sum(0, trading_pnls[start:end])
+        daily_result.turnover = sequential_sum(0, turnovers[start:end])
+        daily_result.commission = sequential_sum(0, commissions[start:end])
+        daily_result.slippage = sequential_sum(0, slippages[start:end])
+
+        # Net pnl takes account of commission and slippage cost
+        daily_result.total_pnl = daily_result.trading_pnl + daily_result.holding_pnl
+        daily_result.net_pnl = daily_result.total_pnl - daily_result.commission - daily_result.slippage
+
+        pre_close = daily_result.close_price
+        start_pos = daily_result.end_pos
+
+
 def optimize(
     target_name: str,
     strategy_class: CtaTemplate,
@@ -1222,10 +1993,15 @@ def optimize(
     capital: int,
     end: datetime,
     mode: BacktestingMode,
-    inverse: bool
+    inverse: bool,
+    history_data: ColumnarHistory = None,
+    fill_model: FillModel = None
 ):
     """
     Function for running in multiprocessing.pool
+
+    If history_data is given, it is used directly instead of loading
+    history data from database again.
     """
     engine = BacktestingEngine()
 
@@ -1240,11 +2016,17 @@ def optimize(
         capital=capital,
         end=end,
         mode=mode,
-        inverse=inverse
+        inverse=inverse,
+        fill_model=fill_model
     )
 
     engine.add_strategy(strategy_class, setting)
-    engine.load_data()
+
+    if history_data is not None:
+        engine.history_data = history_data
+    else:
+        engine.load_data()
+
     engine.run_backtesting()
     engine.calculate_result()
     statistics = engine.calculate_statistics(output=False)
@@ -1253,35 +2035,6 @@ def optimize(
     return (str(setting), target_value, statistics)
 
 
-@lru_cache(maxsize=1000000)
-def _ga_optimize(parameter_values: tuple):
-    """"""
-    setting = dict(parameter_values)
-
-    result = optimize(
-        ga_target_name,
-        ga_strategy_class,
-        setting,
-        ga_vt_symbol,
-        ga_interval,
-        ga_start,
-        ga_rate,
-        ga_slippage,
-        ga_size,
-        ga_pricetick,
-        ga_capital,
-        ga_end,
-        ga_mode,
-        ga_inverse
-    )
-    return (result[1],)
-
-
-def ga_optimize(parameter_values: list):
-    """"""
-    return _ga_optimize(tuple(parameter_values))
-
-
 @lru_cache(maxsize=999)
 def load_bar_data(
     symbol: str,
@@ -1307,19 +2060,3 @@ def load_tick_data(
     return database_manager.load_tick_data(
         symbol, exchange, start, end
     )
-
-
-# GA related global value
-ga_end = None
-ga_mode = None
-ga_target_name = None
-ga_strategy_class = None
-ga_setting = None
-ga_vt_symbol = None
-ga_interval = None
-ga_start = None
-ga_rate = None
-ga_slippage = None
-ga_size = None
-ga_pricetick = None
-ga_capital = None
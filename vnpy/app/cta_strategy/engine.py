@@ -3,12 +3,15 @@
 import importlib
 import os
 import traceback
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
 from pathlib import Path
 from typing import Any, Callable
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 from copy import copy
+from threading import Lock
+from time import perf_counter
 from tzlocal import get_localzone
 
 from vnpy.event import Event, EventEngine
@@ -32,13 +35,13 @@ from vnpy.trader.constant import (
     Direction,
     OrderType,
     Interval,
-    Exchange,
     Offset,
     Status
 )
 from vnpy.trader.utility import load_json, save_json, extract_vt_symbol, round_to
 from vnpy.trader.database import database_manager
 from vnpy.trader.rqdata import rqdata_client
+from vnpy.trader.history import history_cache, query_database
 from vnpy.trader.converter import OffsetConverter
 
 from .base import (
@@ -72,6 +75,10 @@ class CtaEngine(BaseEngine):
     setting_filename = "cta_strategy_setting.json"
     data_filename = "cta_strategy_data.json"
 
+    # Max number of threads used when initing all strategies, set to 1
+    # for initing strategies one by one
+    init_workers = 10
+
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine):
         """"""
         super(CtaEngine, self).__init__(
@@ -92,8 +99,16 @@ class CtaEngine(BaseEngine):
         self.stop_order_count = 0   # for generating stop_orderid
         self.stop_orders = {}       # stop_orderid: stop_order
 
+        # vt_symbol: list of (price, count, stop_orderid) sorted by price
+        self.long_stop_orders = defaultdict(list)
+        self.short_stop_orders = defaultdict(list)
+
         self.init_executor = ThreadPoolExecutor(max_workers=1)
 
+        # Gateway and RQData are not thread safe, calls to them from
+        # strategies inited in parallel are serialized
+        self.source_lock = Lock()
+
         self.rq_client = None
         self.rq_symbols = set()
 
@@ -130,21 +145,19 @@ class CtaEngine(BaseEngine):
         if result:
             self.write_log("RQData数据接口初始化成功")
 
-    def query_bar_from_rq(
-        self, symbol: str, exchange: Exchange, interval: Interval, start: datetime, end: datetime
-    ):
+    def query_bar_from_rq(self, req: HistoryRequest):
         """
         Query bar data from RQData.
         """
-        req = HistoryRequest(
-            symbol=symbol,
-            exchange=exchange,
-            interval=interval,
-            start=start,
-            end=end
-        )
-        data = rqdata_client.query_history(req)
-        return data
+        with self.source_lock:
+            return rqdata_client.query_history(req)
+
+    def query_bar_from_gateway(self, req: HistoryRequest, gateway_name: str):
+        """
+        Query bar data from gateway.
+        """
+        with self.source_lock:
+            return self.main_engine.query_history(req, gateway_name)
 
     def process_tick_event(self, event: Event):
         """"""
@@ -230,63 +243,108 @@ class CtaEngine(BaseEngine):
 
     def check_stop_order(self, tick: TickData):
         """"""
-        for stop_order in list(self.stop_orders.values()):
-            if stop_order.vt_symbol != tick.vt_symbol:
+        # Long stop orders with price <= last price and short stop orders
+        # with price >= last price are triggered
+        triggered = []
+
+        long_orders = self.long_stop_orders.get(tick.vt_symbol, None)
+        if long_orders:
+            ix = bisect_right(long_orders, (tick.last_price, float("inf")))
+            triggered.extend(long_orders[:ix])
+
+        short_orders = self.short_stop_orders.get(tick.vt_symbol, None)
+        if short_orders:
+            ix = bisect_left(short_orders, (tick.last_price,))
+            triggered.extend(short_orders[ix:])
+
+        if not triggered:
+            return
+
+        # Process in the order of stop orders created
+        triggered.sort(key=lambda item: item[1])
+
+        for _, _, stop_orderid in triggered:
+            # Stop order may be cancelled by callback of strategy
+            stop_order = self.stop_orders.get(stop_orderid, None)
+            if not stop_order:
                 continue
 
-            long_triggered = (
-                stop_order.direction == Direction.LONG and tick.last_price >= stop_order.price
-            )
-            short_triggered = (
-                stop_order.direction == Direction.SHORT and tick.last_price <= stop_order.price
-            )
+            strategy = self.strategies[stop_order.strategy_name]
 
-            if long_triggered or short_triggered:
-                strategy = self.strategies[stop_order.strategy_name]
-
-                # To get excuted immediately after stop order is
-                # triggered, use limit price if available, otherwise
-                # use ask_price_5 or bid_price_5
-                if stop_order.direction == Direction.LONG:
-                    if tick.limit_up:
-                        price = tick.limit_up
-                    else:
-                        price = tick.ask_price_5
+            # To get excuted immediately after stop order is
+            # triggered, use limit price if available, otherwise
+            # use ask_price_5 or bid_price_5
+            if stop_order.direction == Direction.LONG:
+                if tick.limit_up:
+                    price = tick.limit_up
                 else:
-                    if tick.limit_down:
-                        price = tick.limit_down
-                    else:
-                        price = tick.bid_price_5
-
-                contract = self.main_engine.get_contract(stop_order.vt_symbol)
-
-                vt_orderids = self.send_limit_order(
-                    strategy,
-                    contract,
-                    stop_order.direction,
-                    stop_order.offset,
-                    price,
-                    stop_order.volume,
-                    stop_order.lock
+                    price = tick.ask_price_5
+            else:
+                if tick.limit_down:
+                    price = tick.limit_down
+                else:
+                    price = tick.bid_price_5
+
+            contract = self.main_engine.get_contract(stop_order.vt_symbol)
+
+            vt_orderids = self.send_limit_order(
+                strategy,
+                contract,
+                stop_order.direction,
+                stop_order.offset,
+                price,
+                stop_order.volume,
+                stop_order.lock
+            )
+
+            # Update stop order status if placed successfully
+            if vt_orderids:
+                # Remove from relation map.
+                self.remove_stop_order(stop_order)
+
+                strategy_vt_orderids = self.strategy_orderid_map[strategy.strategy_name]
+                if stop_order.stop_orderid in strategy_vt_orderids:
+                    strategy_vt_orderids.remove(stop_order.stop_orderid)
+
+                # Change stop order status to cancelled and update to strategy.
+                stop_order.status = StopOrderStatus.TRIGGERED
+                stop_order.vt_orderids = vt_orderids
+
+                self.call_strategy_func(
+                    strategy, strategy.on_stop_order, stop_order
                 )
+                self.put_stop_order_event(stop_order)
 
-                # Update stop order status if placed successfully
-                if vt_orderids:
-                    # Remove from relation map.
-                    self.stop_orders.pop(stop_order.stop_orderid)
+    def add_stop_order(self, stop_order: StopOrder):
+        """
+        Add local stop order into price sorted list of its vt_symbol.
+        """
+        self.stop_orders[stop_order.stop_orderid] = stop_order
+
+        if stop_order.direction == Direction.LONG:
+            orders = self.long_stop_orders[stop_order.vt_symbol]
+        else:
+            orders = self.short_stop_orders[stop_order.vt_symbol]
 
-                    strategy_vt_orderids = self.strategy_orderid_map[strategy.strategy_name]
-                    if stop_order.stop_orderid in strategy_vt_orderids:
-                        strategy_vt_orderids.remove(stop_order.stop_orderid)
+        insort(orders, (stop_order.price, self.stop_order_count, stop_order.stop_orderid))
 
-                    # Change stop order status to cancelled and update to strategy.
-                    stop_order.status = StopOrderStatus.TRIGGERED
-                    stop_order.vt_orderids = vt_orderids
+    def remove_stop_order(self, stop_order: StopOrder):
+        """
+        Remove local stop order from price sorted list of its vt_symbol.
+        """
+        self.stop_orders.pop(stop_order.stop_orderid)
+
+        if stop_order.direction == Direction.LONG:
+            orders = self.long_stop_orders[stop_order.vt_symbol]
+        else:
+            orders = self.short_stop_orders[stop_order.vt_symbol]
 
-                    self.call_strategy_func(
-                        strategy, strategy.on_stop_order, stop_order
-                    )
-                    self.put_stop_order_event(stop_order)
+        ix = bisect_left(orders, (stop_order.price,))
+        while ix < len(orders) and orders[ix][0] == stop_order.price:
+            if orders[ix][2] == stop_order.stop_orderid:
+                orders.pop(ix)
+                break
+            ix += 1
 
     def send_server_order(
         self,
@@ -416,7 +474,7 @@ class CtaEngine(BaseEngine):
             lock=lock
         )
 
-        self.stop_orders[stop_orderid] = stop_order
+        self.add_stop_order(stop_order)
 
         vt_orderids = self.strategy_orderid_map[strategy.strategy_name]
         vt_orderids.add(stop_orderid)
@@ -448,7 +506,7 @@ class CtaEngine(BaseEngine):
         strategy = self.strategies[stop_order.strategy_name]
 
         # Remove from relation map.
-        self.stop_orders.pop(stop_orderid)
+        self.remove_stop_order(stop_order)
 
         vt_orderids = self.strategy_orderid_map[strategy.strategy_name]
         if stop_orderid in vt_orderids:
@@ -537,32 +595,36 @@ class CtaEngine(BaseEngine):
         start = end - timedelta(days)
         bars = []
 
+        req = HistoryRequest(
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+            start=start,
+            end=end
+        )
+
         # Pass gateway and RQData if use_database set to True
         if not use_database:
             # Query bars from gateway if available
             contract = self.main_engine.get_contract(vt_symbol)
 
             if contract and contract.history_data:
-                req = HistoryRequest(
-                    symbol=symbol,
-                    exchange=exchange,
-                    interval=interval,
-                    start=start,
-                    end=end
+                gateway_name = contract.gateway_name
+                bars = history_cache.query_history(
+                    req,
+                    lambda req: self.query_bar_from_gateway(req, gateway_name),
+                    gateway_name
                 )
-                bars = self.main_engine.query_history(req, contract.gateway_name)
 
             # Try to query bars from RQData, if not found, load from database.
             else:
-                bars = self.query_bar_from_rq(symbol, exchange, interval, start, end)
+                bars = history_cache.query_history(
+                    req, self.query_bar_from_rq, "RQ"
+                )
 
         if not bars:
-            bars = database_manager.load_bar_data(
-                symbol=symbol,
-                exchange=exchange,
-                interval=interval,
-                start=start,
-                end=end,
+            bars = history_cache.query_history(
+                req, query_database, "DB", save=False
             )
 
         for bar in bars:
@@ -668,7 +730,8 @@ class CtaEngine(BaseEngine):
         if contract:
             req = SubscribeRequest(
                 symbol=contract.symbol, exchange=contract.exchange)
-            self.main_engine.subscribe(req, contract.gateway_name)
+            with self.source_lock:
+                self.main_engine.subscribe(req, contract.gateway_name)
         else:
             self.write_log(f"行情订阅失败，找不到合约{strategy.vt_symbol}", strategy)
 
@@ -839,8 +902,49 @@ class CtaEngine(BaseEngine):
     def init_all_strategies(self):
         """
         """
-        for strategy_name in self.strategies.keys():
-            self.init_strategy(strategy_name)
+        if self.init_workers <= 1:
+            for strategy_name in self.strategies.keys():
+                self.init_strategy(strategy_name)
+            return
+
+        # Strategies of the same vt_symbol are inited one by one, so
+        # that history data loaded by the first one is reused from cache.
+        groups = defaultdict(list)
+        for strategy_name, strategy in self.strategies.items():
+            groups[strategy.vt_symbol].append(strategy_name)
+
+        self.init_executor.submit(self._init_all_strategies, list(groups.values()))
+
+    def _init_all_strategies(self, groups: list):
+        """
+        Init groups of strategies concurrently in thread pool.
+        """
+        total = sum([len(strategy_names) for strategy_names in groups])
+        self.write_log(f"开始并行初始化{total}个策略")
+
+        start = perf_counter()
+        progress = {"count": 0}
+        lock = Lock()
+
+        def init_group(strategy_names: list):
+            for strategy_name in strategy_names:
+                try:
+                    self._init_strategy(strategy_name)
+                except Exception:
+                    msg = f"{strategy_name}初始化出错\n{traceback.format_exc()}"
+                    self.write_log(msg)
+
+                with lock:
+                    progress["count"] += 1
+                    count = progress["count"]
+                self.write_log(f"策略初始化进度{count}/{total}")
+
+        with ThreadPoolExecutor(max_workers=self.init_workers) as executor:
+            for strategy_names in groups:
+                executor.submit(init_group, strategy_names)
+
+        cost = perf_counter() - start
+        self.write_log(f"全部策略初始化完成，耗时{cost:.1f}秒")
 
     def start_all_strategies(self):
         """
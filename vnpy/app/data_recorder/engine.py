@@ -1,9 +1,11 @@
 """"""
 
 import sys
-from threading import Thread
+from threading import Thread, Event as ThreadEvent
 from queue import Queue, Empty
 from copy import copy
+from time import perf_counter
+from typing import Dict, List
 
 from vnpy.event import Event, EventEngine
 from vnpy.trader.engine import BaseEngine, MainEngine
@@ -15,10 +17,12 @@ from vnpy.trader.object import (
     ContractData
 )
 from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT
-from vnpy.trader.utility import load_json, save_json, BarGenerator
+from vnpy.trader.utility import load_json, save_json, get_folder_path, BarGenerator
 from vnpy.trader.database import database_manager
 from vnpy.app.spread_trading.base import EVENT_SPREAD_DATA, SpreadData
 
+from .journal import TickJournal
+
 
 APP_NAME = "DataRecorder"
 
@@ -31,6 +35,24 @@ class RecorderEngine(BaseEngine):
     """"""
     setting_filename = "data_recorder_setting.json"
 
+    # Data is saved into database when batch size reached or
+    # flush interval (seconds) passed since last save.
+    batch_size = 500
+    flush_interval = 1
+
+    # Write log when queue size exceeds warning size
+    warning_size = 10000
+
+    # In journal mode, tick data is written into local journal first,
+    # and ingested into database every ingest interval (seconds).
+    journal_folder = "recorder_journal"
+    ingest_interval = 10
+    ingest_size = 10000
+
+    # In journal mode, bar data failed to save is kept in memory and
+    # retried every retry interval (seconds).
+    retry_interval = 5
+
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine):
         """"""
         super().__init__(main_engine, event_engine, APP_NAME)
@@ -39,10 +61,31 @@ class RecorderEngine(BaseEngine):
         self.thread = Thread(target=self.run)
         self.active = False
 
+        self.ticks: List[TickData] = []
+        self.bars: List[BarData] = []
+        self.last_flush: float = 0
+        self.warning: bool = False
+        self.bar_retry: float = 0
+
+        self.statistics: Dict[str, float] = {
+            "queue_size": 0,
+            "max_queue_size": 0,
+            "tick_count": 0,
+            "bar_count": 0,
+            "flush_count": 0,
+            "flush_time": 0,
+            "max_flush_time": 0,
+        }
+
         self.tick_recordings = {}
         self.bar_recordings = {}
         self.bar_generators = {}
 
+        self.journal_mode: bool = False
+        self.journal: TickJournal = None
+        self.ingest_thread: Thread = Thread(target=self.run_ingest)
+        self.ingest_signal: ThreadEvent = ThreadEvent()
+
         self.load_setting()
         self.register_event()
         self.start()
@@ -53,47 +96,187 @@ class RecorderEngine(BaseEngine):
         setting = load_json(self.setting_filename)
         self.tick_recordings = setting.get("tick", {})
         self.bar_recordings = setting.get("bar", {})
+        self.journal_mode = setting.get("journal", False)
 
     def save_setting(self):
         """"""
         setting = {
             "tick": self.tick_recordings,
-            "bar": self.bar_recordings
+            "bar": self.bar_recordings,
+            "journal": self.journal_mode
         }
         save_json(self.setting_filename, setting)
 
     def run(self):
         """"""
+        self.last_flush = perf_counter()
+
         while self.active:
+            timeout = self.last_flush + self.flush_interval - perf_counter()
+
             try:
-                task = self.queue.get(timeout=1)
-                task_type, data = task
+                task = self.queue.get(timeout=max(timeout, 0.001))
+                self.add_task(task)
+            except Empty:
+                pass
 
-                if task_type == "tick":
-                    database_manager.save_tick_data([data])
-                elif task_type == "bar":
-                    database_manager.save_bar_data([data])
+            if (
+                len(self.ticks) + (0 if self.bar_retry else len(self.bars)) >= self.batch_size
+                or perf_counter() - self.last_flush >= self.flush_interval
+            ):
+                if not self.flush():
+                    return
 
+        # Save all data left in queue before exit
+        while True:
+            try:
+                task = self.queue.get_nowait()
+                self.add_task(task)
             except Empty:
-                continue
+                break
+
+        self.bar_retry = 0
+        self.flush()
 
-            except Exception:
+    def add_task(self, task: tuple):
+        """"""
+        task_type, data = task
+
+        if task_type == "tick":
+            self.ticks.append(data)
+        elif task_type == "bar":
+            self.bars.append(data)
+
+    def flush(self) -> bool:
+        """
+        Save data cached into database in batch.
+        """
+        start = perf_counter()
+        tick_count = len(self.ticks)
+        bar_count = 0
+
+        try:
+            if self.ticks:
+                if self.journal:
+                    self.journal.write(self.ticks)
+                else:
+                    database_manager.save_tick_data(self.ticks)
+                self.ticks = []
+
+            if self.bars and start >= self.bar_retry:
+                database_manager.save_bar_data(self.bars)
+
+                bar_count = len(self.bars)
+                self.bars = []
+
+                if self.bar_retry:
+                    self.bar_retry = 0
+                    self.write_log("K线数据写入数据库恢复")
+        except Exception as e:
+            # Tick data is still captured into journal while database
+            # unavailable, bar data is kept and saved later
+            if self.journal and not self.ticks:
+                if not self.bar_retry:
+                    self.write_log(f"K线数据写入数据库失败，稍后重试：{e}")
+                self.bar_retry = perf_counter() + self.retry_interval
+            else:
                 self.active = False
 
                 info = sys.exc_info()
                 event = Event(EVENT_RECORDER_EXCEPTION, info)
                 self.event_engine.put(event)
+                return False
+
+        end = perf_counter()
+        self.last_flush = end
+        self.update_statistics(end - start, tick_count, bar_count)
+
+        return True
+
+    def update_statistics(self, flush_time: float, tick_count: int, bar_count: int):
+        """"""
+        statistics = self.statistics
+        queue_size = self.queue.qsize()
+
+        statistics["queue_size"] = queue_size
+        statistics["max_queue_size"] = max(statistics["max_queue_size"], queue_size)
+
+        if tick_count or bar_count:
+            statistics["tick_count"] += tick_count
+            statistics["bar_count"] += bar_count
+            statistics["flush_count"] += 1
+            statistics["flush_time"] = flush_time
+            statistics["max_flush_time"] = max(statistics["max_flush_time"], flush_time)
+
+        # Warn once each time queue size exceeds warning size
+        if queue_size > self.warning_size:
+            if not self.warning:
+                self.warning = True
+                self.write_log(f"数据记录队列积压：{queue_size}，上次写入耗时{flush_time:.3f}秒")
+        else:
+            self.warning = False
+
+    def get_statistics(self) -> Dict[str, float]:
+        """
+        Get backpressure metrics of database writer.
+        """
+        statistics = self.statistics.copy()
+        statistics["queue_size"] = self.queue.qsize()
+        return statistics
+
+    def run_ingest(self):
+        """
+        Ingest complete journal segments into database periodically.
+        """
+        while self.active:
+            self.ingest_signal.wait(self.ingest_interval)
+            self.journal.rotate()
+            self.ingest()
+
+    def ingest(self) -> bool:
+        """
+        Ingest journal segments into database and remove them. Segments
+        failed are kept and retried next time.
+        """
+        for path in self.journal.get_segments():
+            try:
+                history = self.journal.read_segment(path)
+
+                for i in range(0, len(history), self.ingest_size):
+                    ticks = history[i:i + self.ingest_size].to_list()
+                    database_manager.save_tick_data(ticks)
+            except Exception as e:
+                self.write_log(f"Tick日志{path.name}导入数据库失败：{e}")
+                return False
+
+            path.unlink()
+
+        return True
 
     def close(self):
         """"""
         self.active = False
 
-        if self.thread.isAlive():
+        if self.thread.is_alive():
             self.thread.join()
 
+        if self.ingest_thread.is_alive():
+            self.ingest_signal.set()
+            self.ingest_thread.join()
+
+            # Data left is ingested on next start if failed now
+            self.journal.rotate()
+            self.ingest()
+
     def start(self):
         """"""
         self.active = True
+
+        if self.journal_mode:
+            folder = get_folder_path(self.journal_folder)
+            self.journal = TickJournal(folder)
+            self.ingest_thread.start()
+
         self.thread.start()
 
     def add_bar_recording(self, vt_symbol: str):
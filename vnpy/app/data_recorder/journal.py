@@ -0,0 +1,133 @@
+"""
+Append-only local journal of tick data.
+"""
+
+import os
+from pathlib import Path
+from threading import Lock
+from time import time_ns
+from typing import BinaryIO, Dict, List
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from vnpy.trader.columnar import TICK_DTYPE, TICK_FIELDS, TickHistory
+from vnpy.trader.database.database import DB_TZ
+from vnpy.trader.object import TickData
+from vnpy.trader.utility import extract_vt_symbol
+
+
+# Header of each file saves the contract name, followed by fixed width
+# records of TICK_DTYPE.
+HEADER_SIZE: int = 128
+SUFFIX: str = ".tick"
+
+
+class TickJournal:
+    """
+    Tick data of each contract is appended into its own segment file.
+    Segments are rotated and become complete, then they can be read and
+    ingested into database and removed.
+
+    Datetime is saved as naive time in database timezone. Incomplete
+    record at the end of file (e.g. process crashed while writing) is
+    ignored when read.
+    """
+
+    def __init__(self, folder: Path):
+        """"""
+        self.folder: Path = folder
+        self.files: Dict[str, BinaryIO] = {}
+        self.lock: Lock = Lock()
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+    def write(self, ticks: List[TickData]) -> None:
+        """
+        Append tick data into segment files and fsync them.
+        """
+        groups: Dict[str, List[TickData]] = {}
+        for tick in ticks:
+            groups.setdefault(tick.vt_symbol, []).append(tick)
+
+        with self.lock:
+            for vt_symbol, data in groups.items():
+                f = self.files.get(vt_symbol, None)
+                if not f:
+                    f = self.open_file(vt_symbol, data[0].name)
+
+                array = np.empty(len(data), dtype=TICK_DTYPE)
+                array["datetime"] = [
+                    tick.datetime.astimezone(DB_TZ).replace(tzinfo=None)
+                    for tick in data
+                ]
+                for name in TICK_FIELDS:
+                    array[name] = [getattr(tick, name) for tick in data]
+
+                f.write(array.tobytes())
+
+            for vt_symbol in groups.keys():
+                f = self.files[vt_symbol]
+                f.flush()
+                os.fsync(f.fileno())
+
+    def open_file(self, vt_symbol: str, name: str) -> BinaryIO:
+        """"""
+        # Quote vt_symbol to keep path separator etc. out of filename
+        path = self.folder.joinpath(f"{quote(vt_symbol, safe='')}_{time_ns()}{SUFFIX}")
+
+        f = open(path, "wb")
+        f.write(name.encode("utf-8")[:HEADER_SIZE].ljust(HEADER_SIZE, b"\0"))
+
+        self.files[vt_symbol] = f
+        return f
+
+    def rotate(self) -> None:
+        """
+        Close current segment files, new data will be written into new
+        segments.
+        """
+        with self.lock:
+            for f in self.files.values():
+                f.close()
+            self.files.clear()
+
+    def get_segments(self) -> List[Path]:
+        """
+        Get complete segment files in time order.
+        """
+        # Glob under lock, so no segment is opened between getting
+        # opened files and listing segments
+        with self.lock:
+            opened = {Path(f.name) for f in self.files.values()}
+            paths = [
+                path for path in self.folder.glob(f"*{SUFFIX}")
+                if path not in opened
+            ]
+
+        paths.sort(key=lambda path: int(path.stem.rsplit("_", 1)[1]))
+        return paths
+
+    @staticmethod
+    def read_segment(path: Path) -> TickHistory:
+        """
+        Read tick data of segment file.
+        """
+        vt_symbol = unquote(path.stem.rsplit("_", 1)[0])
+        symbol, exchange = extract_vt_symbol(vt_symbol)
+
+        with open(path, "rb") as f:
+            name = f.read(HEADER_SIZE).rstrip(b"\0").decode("utf-8", "ignore")
+            buf = f.read()
+
+        count = len(buf) // TICK_DTYPE.itemsize
+        array = np.frombuffer(buf, dtype=TICK_DTYPE, count=count)
+
+        return TickHistory(
+            symbol,
+            exchange,
+            array=array,
+            tz=DB_TZ,
+            gateway_name="DB",
+            name=name
+        )
@@ -39,7 +39,9 @@ class RtdEngine(BaseEngine):
         """
         Register event handler.
         """
-        self.event_engine.register(EVENT_TICK, self.process_tick_event)
+        self.event_engine.register(
+            EVENT_TICK, self.process_tick_event, latest_only=True
+        )
 
     def process_tick_event(self, event: Event) -> None:
         """
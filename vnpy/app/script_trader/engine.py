@@ -24,9 +24,11 @@ from vnpy.trader.object import (
     AccountData,
     ContractData,
     LogData,
-    BarData
+    BarData,
+    get_data_dict
 )
 from vnpy.trader.rqdata import rqdata_client
+from vnpy.trader.history import history_cache
 
 
 APP_NAME = "ScriptTrader"
@@ -257,7 +259,11 @@ class ScriptEngine(BaseEngine):
             interval=interval
         )
 
-        return get_data(rqdata_client.query_history, arg=req, use_df=use_df)
+        return get_data(
+            lambda req: history_cache.query_history(req, rqdata_client.query_history, "RQ"),
+            arg=req,
+            use_df=use_df
+        )
 
     def write_log(self, msg: str) -> None:
         """"""
@@ -278,7 +284,7 @@ def to_df(data_list: Sequence):
     if not data_list:
         return None
 
-    dict_list = [data.__dict__ for data in data_list]
+    dict_list = [get_data_dict(data) for data in data_list]
     return DataFrame(dict_list)
 
 
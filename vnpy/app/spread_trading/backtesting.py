@@ -1,4 +1,4 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import date, datetime
 from typing import Callable, Type
 
@@ -10,6 +10,7 @@ from plotly.subplots import make_subplots
 from vnpy.trader.constant import (Direction, Offset, Exchange,
                                   Interval, Status)
 from vnpy.trader.object import TradeData, BarData, TickData
+from vnpy.trader.fill_model import FillModel
 
 from .template import SpreadStrategyTemplate, SpreadAlgoTemplate
 from .base import SpreadData, BacktestingMode, load_bar_data, load_tick_data
@@ -48,6 +49,11 @@ class BacktestingEngine:
         self.algos = {}
         self.active_algos = {}
 
+        self.fill_model = FillModel()
+        self.algo_datetimes = {}        # algoid: datetime started
+        self.arrived_algoids = set()
+        self.stop_requests = deque()    # (arrive time, algoid)
+
         self.trade_count = 0
         self.trades = {}
 
@@ -75,6 +81,11 @@ class BacktestingEngine:
         self.algos.clear()
         self.active_algos.clear()
 
+        self.fill_model.clear()
+        self.algo_datetimes.clear()
+        self.arrived_algoids.clear()
+        self.stop_requests.clear()
+
         self.trade_count = 0
         self.trades.clear()
 
@@ -92,9 +103,14 @@ class BacktestingEngine:
         pricetick: float,
         capital: int = 0,
         end: datetime = None,
-        mode: BacktestingMode = BacktestingMode.BAR
+        mode: BacktestingMode = BacktestingMode.BAR,
+        fill_model: FillModel = None
     ):
-        """"""
+        """
+        Algos in tick mode are matched by fill_model as limit orders,
+        default one fills the whole algo once its price crosses best
+        price.
+        """
         self.spread = spread
         self.interval = Interval(interval)
         self.rate = rate
@@ -105,6 +121,8 @@ class BacktestingEngine:
         self.capital = capital
         self.end = end
         self.mode = mode
+        self.fill_model = fill_model or FillModel()
+        self.fill_model.clear()
 
     def add_strategy(self, strategy_class: type, setting: dict):
         """"""
@@ -137,7 +155,7 @@ class BacktestingEngine:
                 self.pricetick
             )
         else:
-            self.history_datas = load_tick_data(
+            self.history_data = load_tick_data(
                 self.spread,
                 self.start,
                 self.end
@@ -458,45 +476,82 @@ class BacktestingEngine:
     def cross_algo(self):
         """
         Cross limit order with last bar/tick data.
+
+        In tick mode, algos are matched by fill model, which may also
+        simulate latency and partial fill.
         """
         if self.mode == BacktestingMode.BAR:
             long_cross_price = self.bar.close_price
             short_cross_price = self.bar.close_price
         else:
-            long_cross_price = self.tick.ask_price_1
-            short_cross_price = self.tick.bid_price_1
+            fill_model = self.fill_model
+            fill_model.update_tick(self.tick)
+            self.process_stop_requests()
 
         for algo in list(self.active_algos.values()):
-            # Check whether limit orders can be filled.
-            long_cross = (
-                algo.direction == Direction.LONG
-                and algo.price >= long_cross_price
-            )
-
-            short_cross = (
-                algo.direction == Direction.SHORT
-                and algo.price <= short_cross_price
-            )
-
-            if not long_cross and not short_cross:
+            # Algo may be stopped by callback of strategy
+            if algo.algoid not in self.active_algos:
                 continue
 
-            # Push order udpate with status "all traded" (filled).
-            algo.traded = algo.volume
-            algo.status = Status.ALLTRADED
+            # Check whether limit orders can be filled.
+            if self.mode == BacktestingMode.BAR:
+                long_cross = (
+                    algo.direction == Direction.LONG
+                    and algo.price >= long_cross_price
+                )
+
+                short_cross = (
+                    algo.direction == Direction.SHORT
+                    and algo.price <= short_cross_price
+                )
+
+                if long_cross:
+                    trade_price = long_cross_price
+                elif short_cross:
+                    trade_price = short_cross_price
+                else:
+                    continue
+
+                volume = algo.volume - algo.traded
+            else:
+                # Algo not arrived at exchange yet
+                if algo.algoid not in self.arrived_algoids:
+                    start = self.algo_datetimes[algo.algoid]
+                    if start + fill_model.latency > self.datetime:
+                        continue
+
+                    self.arrived_algoids.add(algo.algoid)
+                    fill_model.add_order(algo.algoid, algo.direction, algo.price)
+
+                trade_price, volume = fill_model.match_order(
+                    algo.algoid,
+                    algo.direction,
+                    algo.price,
+                    algo.volume - algo.traded
+                )
+
+                if not volume:
+                    continue
+
+            # Push order udpate with status "all traded" (filled) or
+            # "part traded".
+            algo.traded += volume
+            if algo.traded < algo.volume:
+                algo.status = Status.PARTTRADED
+            else:
+                algo.status = Status.ALLTRADED
             self.strategy.update_spread_algo(algo)
 
-            self.active_algos.pop(algo.algoid)
+            if algo.status == Status.ALLTRADED:
+                self.remove_algo(algo.algoid)
 
             # Push trade update
             self.trade_count += 1
 
-            if long_cross:
-                trade_price = long_cross_price
-                pos_change = algo.volume
+            if algo.direction == Direction.LONG:
+                pos_change = volume
             else:
-                trade_price = short_cross_price
-                pos_change = -algo.volume
+                pos_change = -volume
 
             trade = TradeData(
                 symbol=self.spread.name,
@@ -506,7 +561,7 @@ class BacktestingEngine:
                 direction=algo.direction,
                 offset=algo.offset,
                 price=trade_price,
-                volume=algo.volume,
+                volume=volume,
                 datetime=self.datetime,
                 gateway_name=self.gateway_name,
             )
@@ -521,6 +576,22 @@ class BacktestingEngine:
 
             self.trades[trade.vt_tradeid] = trade
 
+    def process_stop_requests(self):
+        """
+        Stop algos with stop request arrived at exchange.
+        """
+        stop_requests = self.stop_requests
+
+        while stop_requests and stop_requests[0][0] <= self.datetime:
+            _, algoid = stop_requests.popleft()
+            self.process_stop(algoid)
+
+    def remove_algo(self, algoid: str):
+        """"""
+        self.active_algos.pop(algoid)
+        self.arrived_algoids.discard(algoid)
+        self.fill_model.remove_order(algoid)
+
     def load_bar(
         self, spread: SpreadData, days: int, interval: Interval, callback: Callable
     ):
@@ -564,6 +635,7 @@ class BacktestingEngine:
 
         self.algos[algoid] = algo
         self.active_algos[algoid] = algo
+        self.algo_datetimes[algoid] = self.datetime
 
         return algoid
 
@@ -575,7 +647,21 @@ class BacktestingEngine:
         """"""
         if algoid not in self.active_algos:
             return
-        algo = self.active_algos.pop(algoid)
+
+        # Algo can still be filled before stop request arrived
+        latency = self.fill_model.latency
+        if self.mode == BacktestingMode.TICK and latency:
+            self.stop_requests.append((self.datetime + latency, algoid))
+            return
+
+        self.process_stop(algoid)
+
+    def process_stop(self, algoid: str):
+        """"""
+        algo = self.active_algos.get(algoid, None)
+        if not algo:
+            return
+        self.remove_algo(algoid)
 
         algo.status = Status.CANCELLED
         self.strategy.update_spread_algo(algo)
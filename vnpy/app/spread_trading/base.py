@@ -381,15 +381,30 @@ def load_bar_data(
 ):
     """"""
     # Load bar data of each spread leg
-    leg_bars: Dict[str, Dict] = {}
+    leg_data: Dict[str, List[BarData]] = {}
 
     for vt_symbol in spread.legs.keys():
         symbol, exchange = extract_vt_symbol(vt_symbol)
 
-        bar_data: List[BarData] = database_manager.load_bar_data(
+        leg_data[vt_symbol] = database_manager.load_bar_data(
             symbol, exchange, interval, start, end
         )
 
+    return calculate_spread_bars(spread, interval, leg_data, pricetick)
+
+
+def calculate_spread_bars(
+    spread: SpreadData,
+    interval: Interval,
+    leg_data: Dict[str, List[BarData]],
+    pricetick: float = 0
+) -> List[BarData]:
+    """
+    Calculate spread bar data from bar data of each spread leg.
+    """
+    leg_bars: Dict[str, Dict] = {}
+
+    for vt_symbol, bar_data in leg_data.items():
         bars: Dict[datetime, BarData] = {bar.datetime: bar for bar in bar_data}
         leg_bars[vt_symbol] = bars
 
@@ -417,7 +432,7 @@ def load_bar_data(
 
             spread_bar = BarData(
                 symbol=spread.name,
-                exchange=exchange.LOCAL,
+                exchange=Exchange.LOCAL,
                 datetime=dt,
                 interval=interval,
                 open_price=spread_price,
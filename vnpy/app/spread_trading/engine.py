@@ -13,22 +13,23 @@ from vnpy.trader.event import (
     EVENT_TICK, EVENT_POSITION, EVENT_CONTRACT,
     EVENT_ORDER, EVENT_TRADE, EVENT_TIMER
 )
-from vnpy.trader.utility import load_json, save_json
+from vnpy.trader.utility import load_json, save_json, extract_vt_symbol
 from vnpy.trader.object import (
     TickData, ContractData, LogData,
-    SubscribeRequest, OrderRequest
+    SubscribeRequest, OrderRequest, HistoryRequest
 )
 from vnpy.trader.constant import (
     Direction, Offset, OrderType, Interval
 )
 from vnpy.trader.converter import OffsetConverter
+from vnpy.trader.history import history_cache, query_database
 
 from .base import (
     LegData, SpreadData,
     EVENT_SPREAD_DATA, EVENT_SPREAD_POS,
     EVENT_SPREAD_ALGO, EVENT_SPREAD_LOG,
     EVENT_SPREAD_STRATEGY,
-    load_bar_data, load_tick_data
+    calculate_spread_bars, load_tick_data
 )
 from .template import SpreadAlgoTemplate, SpreadStrategyTemplate
 from .algo import SpreadTakerAlgo
@@ -1031,7 +1032,23 @@ class SpreadStrategyEngine:
         end = datetime.now()
         start = end - timedelta(days)
 
-        bars = load_bar_data(spread, interval, start, end)
+        # Bar data of spread legs is loaded from database through cache
+        leg_data = {}
+        for vt_symbol in spread.legs.keys():
+            symbol, exchange = extract_vt_symbol(vt_symbol)
+
+            req = HistoryRequest(
+                symbol=symbol,
+                exchange=exchange,
+                interval=interval,
+                start=start,
+                end=end
+            )
+            leg_data[vt_symbol] = history_cache.query_history(
+                req, query_database, "DB", save=False
+            )
+
+        bars = calculate_spread_bars(spread, interval, leg_data)
 
         for bar in bars:
             callback(bar)
@@ -1 +1 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import Event, EventEngine, EventLane, EVENT_TIMER, LatestHandler, get_timer_type
@@ -3,12 +3,30 @@ Event-driven framework of vn.py framework.
 """
 
 from collections import defaultdict
+from datetime import datetime
+from heapq import heapify, heappush, heapreplace
 from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable, List
+from threading import Event as ThreadingEvent, Lock, Thread
+from time import perf_counter, time
+from typing import Any, Callable, Dict, List, Tuple
 
 EVENT_TIMER = "eTimer"
+EVENT_CONFLATE = "eConflate"
+
+
+def get_timer_type(interval: float) -> str:
+    """
+    Get event type of timer with specific interval (in seconds),
+    e.g. "eTimer.0.1" for 100ms and "eTimer.60" for 1min.
+    """
+    return f"{EVENT_TIMER}.{interval:g}"
+
+
+def get_next_time(interval: float, now: float) -> float:
+    """
+    Get the first wall-clock boundary of interval after now (timestamp).
+    """
+    return (int(now / interval) + 1) * interval
 
 
 class Event:
@@ -27,6 +45,183 @@ class Event:
 # Defines handler function to be used in event engine.
 HandlerType = Callable[[Event], None]
 
+# Defines function to get conflation key from event.
+KeyFuncType = Callable[[Event], Any]
+
+
+def get_vt_symbol_key(event: Event) -> Any:
+    """
+    Default conflation key: vt_symbol of event data (if any).
+    """
+    return getattr(event.data, "vt_symbol", None)
+
+
+class LatestHandler:
+    """
+    Handler wrapper for latest-only delivery.
+
+    When an event arrives, it is cached by key and a flush event is
+    put at the end of event queue. Events of the same key arriving
+    before the flush is processed only replace the cached one, so the
+    wrapped handler only receives the newest event of every key.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Any,
+        handler: HandlerType,
+        key_func: KeyFuncType = get_vt_symbol_key
+    ):
+        """
+        Dispatcher is the event engine or event lane running the handler,
+        flush events are put into its queue.
+        """
+        self.dispatcher: Any = dispatcher
+        self.handler: HandlerType = handler
+        self.key_func: KeyFuncType = key_func
+
+        self.pending: Dict[Any, Event] = {}
+        self.dropped: int = 0
+
+        # Name shown in handler stats of event engine
+        name = getattr(handler, "__qualname__", repr(handler))
+        self.__qualname__: str = f"{name}[latest]"
+
+    def __call__(self, event: Event) -> None:
+        """
+        Cache the event and schedule a flush if not scheduled yet.
+        """
+        key = self.key_func(event)
+
+        if key in self.pending:
+            self.dropped += 1
+            self.pending[key] = event
+        else:
+            # Cache before flush is queued, which may be processed by
+            # another worker thread of lane at once
+            self.pending[key] = event
+            self.dispatcher.put(Event(EVENT_CONFLATE, (self, key)))
+
+    def pop(self, key: Any) -> Event:
+        """
+        Take out the latest event of the key.
+        """
+        return self.pending.pop(key, None)
+
+
+class EventLane:
+    """
+    Executor lane with dedicated worker thread(s) and queue(s), used for
+    running slow handlers outside the dispatcher thread of event engine.
+
+    With one worker, events are processed in the order they were put
+    into the lane. With several workers, events are routed to worker
+    by key (vt_symbol by default), so the order is kept for every key.
+    """
+
+    def __init__(
+        self,
+        event_engine: "EventEngine",
+        name: str,
+        workers: int = 1,
+        key_func: KeyFuncType = get_vt_symbol_key
+    ):
+        """"""
+        self.event_engine: "EventEngine" = event_engine
+        self.name: str = name
+        self.key_func: KeyFuncType = key_func
+
+        self.handlers: defaultdict = defaultdict(list)
+        self.general_handlers: List = []
+
+        self.active: bool = False
+        self.queues: List[Queue] = [Queue() for _ in range(workers)]
+        self.threads: List[Thread] = [
+            Thread(target=self.run, args=(queue,), name=f"EventLane-{name}-{i}")
+            for i, queue in enumerate(self.queues)
+        ]
+
+        # Name shown in handler stats of event engine
+        self.__qualname__: str = f"EventLane[{name}]"
+
+    def __call__(self, event: Event) -> None:
+        """
+        Called by event engine dispatcher thread.
+        """
+        self.put(event)
+
+    def put(self, event: Event) -> None:
+        """
+        Put event into queue of worker.
+        """
+        queues = self.queues
+        if len(queues) == 1:
+            queues[0].put(event)
+            return
+
+        if event.type == EVENT_CONFLATE:
+            key = event.data[1]
+        else:
+            key = self.key_func(event)
+
+        queues[hash(key) % len(queues)].put(event)
+
+    def run(self, queue: Queue) -> None:
+        """
+        Get event from worker queue and then process it.
+        """
+        while self.active:
+            try:
+                event = queue.get(block=True, timeout=1)
+            except Empty:
+                continue
+
+            self.process(event)
+
+    def process(self, event: Event) -> None:
+        """
+        Distribute event to handlers registered in this lane.
+        """
+        deliver = self.event_engine._deliver
+
+        if event.type == EVENT_CONFLATE:
+            latest_handler, key = event.data
+            latest_event = latest_handler.pop(key)
+            if latest_event:
+                deliver(latest_handler.handler, latest_event)
+            return
+
+        handlers = self.handlers.get(event.type, None)
+        if handlers:
+            for handler in handlers:
+                deliver(handler, event)
+
+        for handler in self.general_handlers:
+            deliver(handler, event)
+
+    def start(self) -> None:
+        """
+        Start worker threads.
+        """
+        self.active = True
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop worker threads.
+        """
+        self.active = False
+        for thread in self.threads:
+            if thread.is_alive():
+                thread.join()
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in all worker queues.
+        """
+        return sum([queue.qsize() for queue in self.queues])
+
 
 class EventEngine:
     """
@@ -37,23 +232,53 @@ class EventEngine:
     which can be used for timing purpose.
     """
 
-    def __init__(self, interval: int = 1):
+    def __init__(
+        self,
+        interval: int = 1,
+        batch_size: int = 0,
+        monitor: bool = False
+    ):
         """
         Timer event is generated every 1 second by default, if
-        interval not specified.
+        interval not specified. Timer events are aligned to wall-clock
+        boundaries of interval, and more timers with other frequencies
+        can be added with add_timer.
+
+        If batch_size is larger than 0, the dispatcher thread drains
+        up to batch_size events from queue each time it wakes up,
+        instead of getting events one by one.
+
+        If monitor is True, the time spent in every handler is
+        recorded and can be checked with get_handler_stats.
         """
         self._interval: int = interval
+        self._batch_size: int = batch_size
+        self._monitor: bool = monitor
         self._queue: Queue = Queue()
         self._active: bool = False
         self._thread: Thread = Thread(target=self._run)
         self._timer: Thread = Thread(target=self._run_timer)
+        self._timer_lock: Lock = Lock()
+        self._timer_signal: ThreadingEvent = ThreadingEvent()
+        self._timer_tasks: List[List] = []   # heap of [next_time, interval, type]
+        self._timer_tasks.append([0, interval, EVENT_TIMER])
         self._handlers: defaultdict = defaultdict(list)
         self._general_handlers: List = []
+        self._latest_handlers: Dict[Tuple[str, HandlerType], LatestHandler] = {}
+        self._lanes: Dict[str, EventLane] = {}
+
+        self._max_queue_size: int = 0
+        self._event_count: int = 0
+        self._handler_stats: Dict[str, List[float]] = {}
 
     def _run(self) -> None:
         """
         Get event from queue and then process it.
         """
+        if self._batch_size > 0:
+            self._run_batch()
+            return
+
         while self._active:
             try:
                 event = self._queue.get(block=True, timeout=1)
@@ -61,6 +286,32 @@ class EventEngine:
             except Empty:
                 pass
 
+    def _run_batch(self) -> None:
+        """
+        Wait for the first event in queue, then take all pending events
+        (up to batch size) under a single lock acquire and process them.
+        """
+        queue = self._queue
+        pending = queue.queue
+
+        while self._active:
+            try:
+                event = queue.get(block=True, timeout=1)
+            except Empty:
+                continue
+
+            with queue.mutex:
+                size = len(pending)
+                count = min(size, self._batch_size - 1)
+                events = [pending.popleft() for _ in range(count)]
+
+            if size + 1 > self._max_queue_size:
+                self._max_queue_size = size + 1
+
+            self._process(event)
+            for event in events:
+                self._process(event)
+
     def _process(self, event: Event) -> None:
         """
         First ditribute event to those handlers registered listening
@@ -69,26 +320,114 @@ class EventEngine:
         Then distrubute event to those general handlers which listens
         to all types.
         """
-        if event.type in self._handlers:
-            [handler(event) for handler in self._handlers[event.type]]
+        if event.type == EVENT_CONFLATE:
+            latest_handler, key = event.data
+            latest_event = latest_handler.pop(key)
 
-        if self._general_handlers:
-            [handler(event) for handler in self._general_handlers]
+            if not latest_event:
+                return
+            elif self._monitor:
+                self._call_monitored(latest_handler.handler, latest_event)
+            else:
+                latest_handler.handler(latest_event)
+            return
+
+        self._event_count += 1
+
+        if self._monitor:
+            self._process_monitored(event)
+            return
+
+        handlers = self._handlers.get(event.type, None)
+        if handlers:
+            for handler in handlers:
+                handler(event)
+
+        for handler in self._general_handlers:
+            handler(event)
+
+    def _process_monitored(self, event: Event) -> None:
+        """
+        Same as _process, but also record time used by every handler.
+        """
+        handlers = self._handlers.get(event.type, None)
+        if handlers:
+            for handler in handlers:
+                self._call_monitored(handler, event)
+
+        for handler in self._general_handlers:
+            self._call_monitored(handler, event)
+
+    def _call_monitored(self, handler: HandlerType, event: Event) -> None:
+        """
+        Call handler and update its [count, total, max] latency stats.
+        """
+        start = perf_counter()
+        handler(event)
+        cost = perf_counter() - start
+
+        name = getattr(handler, "__qualname__", repr(handler))
+        stats = self._handler_stats.get(name, None)
+        if not stats:
+            stats = [0, 0.0, 0.0]
+            self._handler_stats[name] = stats
+
+        stats[0] += 1
+        stats[1] += cost
+        if cost > stats[2]:
+            stats[2] = cost
+
+    def _deliver(self, handler: HandlerType, event: Event) -> None:
+        """
+        Call handler with event, used by event lanes.
+        """
+        if self._monitor:
+            self._call_monitored(handler, event)
+        else:
+            handler(event)
 
     def _run_timer(self) -> None:
         """
-        Sleep by interval second(s) and then generate a timer event.
+        Wait until the nearest timer boundary and then generate the timer
+        event. Next boundary is calculated from wall-clock rather than by
+        adding interval to the time after sleep, so processing time does
+        not cause drift. Boundaries missed (e.g. system was busy) are
+        skipped instead of generating a burst of late timer events.
         """
+        with self._timer_lock:
+            now = time()
+            for task in self._timer_tasks:
+                task[0] = get_next_time(task[1], now)
+            heapify(self._timer_tasks)
+
         while self._active:
-            sleep(self._interval)
-            event = Event(EVENT_TIMER)
-            self.put(event)
+            with self._timer_lock:
+                next_time, interval, type = self._timer_tasks[0]
+
+                now = time()
+                if next_time <= now:
+                    task = [get_next_time(interval, now), interval, type]
+                    heapreplace(self._timer_tasks, task)
+                    wait = 0
+                else:
+                    wait = next_time - now
+
+            if wait:
+                self._timer_signal.wait(wait)
+                self._timer_signal.clear()
+            else:
+                event = Event(type, datetime.fromtimestamp(next_time))
+                self.put(event)
 
     def start(self) -> None:
         """
         Start event engine to process events and generate timer events.
         """
         self._active = True
+
+        for lane in list(self._lanes.values()):
+            lane.start()
+
         self._thread.start()
         self._timer.start()
 
@@ -97,28 +436,208 @@ class EventEngine:
         Stop event engine.
         """
         self._active = False
+        self._timer_signal.set()
         self._timer.join()
         self._thread.join()
 
+        for lane in list(self._lanes.values()):
+            lane.stop()
+
+    def add_timer(self, interval: float) -> str:
+        """
+        Add a timer generating events every interval seconds aligned to
+        wall-clock, and return its event type to register handlers with.
+        """
+        type = get_timer_type(interval)
+
+        with self._timer_lock:
+            for task in self._timer_tasks:
+                if task[2] == type:
+                    return type
+
+            task = [get_next_time(interval, time()), interval, type]
+            heappush(self._timer_tasks, task)
+
+        self._timer_signal.set()
+        return type
+
+    def remove_timer(self, interval: float) -> None:
+        """
+        Remove timer added before with add_timer.
+        """
+        type = get_timer_type(interval)
+
+        with self._timer_lock:
+            tasks = [task for task in self._timer_tasks if task[2] != type]
+            heapify(tasks)
+            self._timer_tasks[:] = tasks
+
+        self._timer_signal.set()
+
+    def add_lane(
+        self,
+        name: str,
+        workers: int = 1,
+        key_func: KeyFuncType = get_vt_symbol_key
+    ) -> EventLane:
+        """
+        Add a named executor lane. Handlers can then be registered
+        into the lane to run in its own worker thread(s).
+        """
+        lane = self._lanes.get(name, None)
+        if lane:
+            return lane
+
+        lane = EventLane(self, name, workers, key_func)
+        self._lanes[name] = lane
+
+        if self._active:
+            lane.start()
+
+        return lane
+
+    def get_lane(self, name: str) -> EventLane:
+        """
+        Get lane object by name.
+        """
+        return self._lanes.get(name, None)
+
+    def get_lane_queue_sizes(self) -> Dict[str, int]:
+        """
+        Get number of events waiting in queue of every lane.
+        """
+        return {
+            name: lane.get_queue_size()
+            for name, lane in list(self._lanes.items())
+        }
+
     def put(self, event: Event) -> None:
         """
         Put an event object into event queue.
         """
         self._queue.put(event)
 
-    def register(self, type: str, handler: HandlerType) -> None:
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in queue.
+        """
+        return self._queue.qsize()
+
+    def get_max_queue_size(self) -> int:
+        """
+        Get max number of events seen in queue at once by batch dispatcher.
+        """
+        return self._max_queue_size
+
+    def get_event_count(self) -> int:
+        """
+        Get number of events processed since engine created.
+        """
+        return self._event_count
+
+    def get_handler_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get call count, total/average/max time cost (in seconds) of
+        every handler. Only available when monitor is enabled.
+        """
+        data = {}
+        for name, (count, total, max_cost) in list(self._handler_stats.items()):
+            data[name] = {
+                "count": count,
+                "total": total,
+                "average": total / count if count else 0,
+                "max": max_cost
+            }
+        return data
+
+    def get_conflation_stats(self) -> Dict[str, int]:
+        """
+        Get number of events dropped by every latest-only handler.
+        """
+        data = {}
+        for (type, handler), latest_handler in list(self._latest_handlers.items()):
+            name = getattr(handler, "__qualname__", repr(handler))
+            data[f"{type}:{name}"] = latest_handler.dropped
+        return data
+
+    def reset_stats(self) -> None:
+        """
+        Clear all dispatch counters.
+        """
+        self._max_queue_size = 0
+        self._event_count = 0
+        self._handler_stats.clear()
+
+        for latest_handler in self._latest_handlers.values():
+            latest_handler.dropped = 0
+
+    def register(
+        self,
+        type: str,
+        handler: HandlerType,
+        latest_only: bool = False,
+        key_func: KeyFuncType = get_vt_symbol_key,
+        lane: str = ""
+    ) -> None:
         """
         Register a new handler function for a specific event type. Every
         function can only be registered once for each event type.
+
+        If latest_only is True, events with same key (vt_symbol of event
+        data by default) queued before the handler runs are conflated
+        and only the newest one is delivered.
+
+        If lane is specified, the handler is called in worker thread of
+        the lane (created with one worker if not added before) instead
+        of the dispatcher thread.
         """
+        if lane:
+            dispatcher = self.add_lane(lane)
+        else:
+            dispatcher = self
+
+        if latest_only:
+            if (type, handler) in self._latest_handlers:
+                return
+
+            latest_handler = LatestHandler(dispatcher, handler, key_func)
+            self._latest_handlers[(type, handler)] = latest_handler
+            handler = latest_handler
+
+        if lane:
+            handler_list = dispatcher.handlers[type]
+            if handler not in handler_list:
+                handler_list.append(handler)
+            self._update_lane(dispatcher)
+            return
+
         handler_list = self._handlers[type]
         if handler not in handler_list:
             handler_list.append(handler)
 
-    def unregister(self, type: str, handler: HandlerType) -> None:
+    def unregister(self, type: str, handler: HandlerType, lane: str = "") -> None:
         """
         Unregister an existing handler function from event engine.
         """
+        latest_handler = self._latest_handlers.pop((type, handler), None)
+        if latest_handler:
+            handler = latest_handler
+
+        if lane:
+            lane_obj = self._lanes.get(lane, None)
+            if not lane_obj:
+                return
+
+            handler_list = lane_obj.handlers.get(type, [])
+            if handler in handler_list:
+                handler_list.remove(handler)
+
+            if not handler_list:
+                lane_obj.handlers.pop(type, None)
+
+            self._update_lane(lane_obj)
+            return
+
         handler_list = self._handlers[type]
 
         if handler in handler_list:
@@ -127,17 +646,64 @@ class EventEngine:
         if not handler_list:
             self._handlers.pop(type)
 
-    def register_general(self, handler: HandlerType) -> None:
+    def register_general(self, handler: HandlerType, lane: str = "") -> None:
         """
         Register a new handler function for all event types. Every
         function can only be registered once for each event type.
         """
+        if lane:
+            lane_obj = self.add_lane(lane)
+            if handler not in lane_obj.general_handlers:
+                lane_obj.general_handlers.append(handler)
+            self._update_lane(lane_obj)
+            return
+
         if handler not in self._general_handlers:
             self._general_handlers.append(handler)
 
-    def unregister_general(self, handler: HandlerType) -> None:
+    def unregister_general(self, handler: HandlerType, lane: str = "") -> None:
         """
         Unregister an existing general handler function.
         """
+        if lane:
+            lane_obj = self._lanes.get(lane, None)
+            if not lane_obj:
+                return
+
+            if handler in lane_obj.general_handlers:
+                lane_obj.general_handlers.remove(handler)
+
+            self._update_lane(lane_obj)
+            return
+
         if handler in self._general_handlers:
             self._general_handlers.remove(handler)
+
+    def _update_lane(self, lane: EventLane) -> None:
+        """
+        Register lane into dispatcher with a single entry, so that every
+        event is put into lane only once:
+        1. as general handler if any general handler in lane, then the
+        lane delivers event to both typed and general handlers
+        2. otherwise as handler of every type with handlers in lane
+        """
+        general = bool(lane.general_handlers)
+
+        for type, handler_list in list(self._handlers.items()):
+            if lane in handler_list and (general or type not in lane.handlers):
+                handler_list.remove(lane)
+                if not handler_list:
+                    self._handlers.pop(type)
+
+        if general:
+            if lane not in self._general_handlers:
+                self._general_handlers.append(lane)
+            return
+
+        if lane in self._general_handlers:
+            self._general_handlers.remove(lane)
+
+        for type in list(lane.handlers.keys()):
+            handler_list = self._handlers[type]
+            if lane not in handler_list:
+                handler_list.append(lane)
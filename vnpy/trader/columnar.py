@@ -0,0 +1,432 @@
+"""
+Columnar in-memory storage of history data.
+
+Data of one contract is stored in a NumPy structured array (one column
+per field) instead of a list of data objects. Data objects are created
+on demand when accessed, so memory usage stays low for long history.
+"""
+
+import os
+from dataclasses import fields
+from datetime import datetime, time, tzinfo
+from pathlib import Path
+from typing import Callable, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from .constant import Exchange, Interval
+from .object import BarData, TickData, CompactBarData, CompactTickData
+
+
+# Float fields of data classes, in the same order as dataclass fields
+BAR_FIELDS: List[str] = [f.name for f in fields(BarData) if f.type is float]
+TICK_FIELDS: List[str] = [f.name for f in fields(TickData) if f.type is float]
+
+BAR_DTYPE: np.dtype = np.dtype(
+    [("datetime", "datetime64[us]")] + [(name, "f8") for name in BAR_FIELDS]
+)
+TICK_DTYPE: np.dtype = np.dtype(
+    [("datetime", "datetime64[us]")] + [(name, "f8") for name in TICK_FIELDS]
+)
+
+# Number of data objects created each time during iteration
+CHUNK_SIZE: int = 100_000
+
+
+def get_trading_dates(datetimes: np.ndarray, daily_end: time = None) -> np.ndarray:
+    """
+    Get trading date of each datetime.
+
+    If daily_end is given (e.g. 15:00 for futures with night session),
+    data after it belongs to the next trading day, and weekend is rolled
+    forward to the next Monday.
+    """
+    if not daily_end:
+        return datetimes.astype("datetime64[D]")
+
+    seconds = daily_end.hour * 3600 + daily_end.minute * 60 + daily_end.second
+    shift = np.timedelta64(86400 - seconds, "s")
+
+    dates = (datetimes + shift).astype("datetime64[D]")
+    return np.busday_offset(dates, 0, roll="forward")
+
+
+def resample_array(
+    array: np.ndarray,
+    window: int,
+    interval: Interval = Interval.MINUTE,
+    daily_end: time = None,
+    keep_last: bool = False
+) -> np.ndarray:
+    """
+    Aggregate structured array of 1 minute bar data into x minute/x hour/
+    x day bar data in a vectorized way.
+
+    Window bars of minute and hour are the same as generated by
+    BarGenerator.update_bar. The last unfinished window bar is dropped
+    unless keep_last is True.
+    """
+    size = len(array)
+    if not size:
+        return np.empty(0, dtype=array.dtype)
+
+    datetimes = array["datetime"]
+
+    # Find the last bar of each window, same rules as BarGenerator
+    if interval == Interval.MINUTE:
+        starts = datetimes.astype("datetime64[m]")
+        minute = (starts - starts.astype("datetime64[h]")).astype(int)
+        finished = (minute + 1) % window == 0
+    elif interval == Interval.HOUR:
+        starts = datetimes.astype("datetime64[h]")
+        hour = (starts - starts.astype("datetime64[D]")).astype(int)
+
+        # BarGenerator finishes the window bar with the first bar of new hour
+        changed = np.zeros(size, dtype=bool)
+        changed[1:] = hour[1:] != hour[:-1]
+        finished = changed & (np.cumsum(changed) % window == 0)
+    elif interval == Interval.DAILY:
+        starts = get_trading_dates(datetimes, daily_end)
+
+        changed = np.zeros(size, dtype=bool)
+        changed[:-1] = starts[1:] != starts[:-1]
+        finished = changed & (np.cumsum(changed) % window == 0)
+    else:
+        raise ValueError(f"unsupported interval {interval}")
+
+    ends = np.flatnonzero(finished) + 1
+    if keep_last and (not len(ends) or ends[-1] != size):
+        ends = np.append(ends, size)
+
+    if not len(ends):
+        return np.empty(0, dtype=array.dtype)
+
+    first = np.concatenate(([0], ends[:-1]))
+    last = ends - 1
+    array = array[:ends[-1]]
+
+    result = np.zeros(len(ends), dtype=array.dtype)
+    result["datetime"] = starts[first]
+    result["open_price"] = array["open_price"][first]
+    result["high_price"] = np.maximum.reduceat(array["high_price"], first)
+    result["low_price"] = np.minimum.reduceat(array["low_price"], first)
+    result["close_price"] = array["close_price"][last]
+    result["volume"] = np.add.reduceat(np.trunc(array["volume"]), first)
+    result["open_interest"] = array["open_interest"][last]
+
+    return result
+
+
+def sort_unique(array: np.ndarray) -> np.ndarray:
+    """
+    Sort structured array by datetime, and keep only the last one of
+    data with the same datetime.
+    """
+    array = array[np.argsort(array["datetime"], kind="stable")]
+
+    datetimes = array["datetime"]
+    keep = np.ones(len(array), dtype=bool)
+    keep[:-1] = datetimes[1:] != datetimes[:-1]
+
+    return array[keep]
+
+
+def write_atomic(path: Path, write: Callable) -> None:
+    """
+    Write into temp file, then replace file of path.
+    """
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as f:
+        write(f)
+    os.replace(temp_path, path)
+
+
+class ColumnarHistory:
+    """
+    Base class of columnar history data of one contract.
+
+    Datetime is stored as naive local time, with the tzinfo shared by
+    all rows kept separately.
+    """
+
+    dtype: np.dtype = None
+    field_names: List[str] = []
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        array: np.ndarray = None,
+        tz: tzinfo = None,
+        gateway_name: str = "DB"
+    ):
+        """"""
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.tz: tzinfo = tz
+        self.gateway_name: str = gateway_name
+
+        if array is None:
+            array = np.empty(0, dtype=self.dtype)
+        self._array: np.ndarray = array
+        self._pending: List[np.ndarray] = []
+        self._filename: str = ""
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        Structured array of all data.
+        """
+        if self._pending:
+            self._array = np.concatenate([self._array] + self._pending)
+            self._pending.clear()
+        return self._array
+
+    def extend(self, datas: Sequence[Union[BarData, TickData]]) -> None:
+        """
+        Convert data objects into columns and append them.
+        """
+        if not datas:
+            return
+
+        if self.tz is None:
+            self.tz = datas[0].datetime.tzinfo
+
+        array = np.empty(len(datas), dtype=self.dtype)
+        array["datetime"] = [d.datetime.replace(tzinfo=None) for d in datas]
+        for name in self.field_names:
+            array[name] = [getattr(d, name) for d in datas]
+
+        self.extend_array(array)
+
+    def extend_array(self, array: np.ndarray) -> None:
+        """
+        Append structured array with the same dtype.
+        """
+        if len(array):
+            self._pending.append(array)
+
+    def clear(self) -> None:
+        """
+        Remove all data.
+        """
+        self._array = np.empty(0, dtype=self.dtype)
+        self._pending.clear()
+
+    def to_mmap(self, path: Union[str, Path]) -> "ColumnarHistory":
+        """
+        Save data into .npy file and return a new history object backed
+        by read-only memory map of the file.
+
+        When pickled (e.g. sent to worker processes), a memory mapped
+        history only carries the file path, and every process maps the
+        same file instead of copying the data.
+        """
+        filename = str(path)
+        np.save(filename, self.array)
+
+        history = self.__class__(
+            self.symbol,
+            self.exchange,
+            array=np.load(filename, mmap_mode="r"),
+            tz=self.tz,
+            gateway_name=self.gateway_name,
+            **self.get_extra_kwargs()
+        )
+        history._filename = filename
+        return history
+
+    def __getstate__(self) -> dict:
+        """"""
+        state = self.__dict__.copy()
+        if self._filename:
+            state["_array"] = None
+        else:
+            state["_array"] = self.array
+            state["_pending"] = []
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """"""
+        self.__dict__.update(state)
+        if self._filename:
+            self._array = np.load(self._filename, mmap_mode="r")
+
+    def __len__(self) -> int:
+        """"""
+        return len(self._array) + sum([len(a) for a in self._pending])
+
+    def __getitem__(self, index: Union[int, slice]):
+        """
+        Return data object for int index, or a new history object sharing
+        the same memory for slice.
+        """
+        if isinstance(index, slice):
+            return self.__class__(
+                self.symbol,
+                self.exchange,
+                array=self.array[index],
+                tz=self.tz,
+                gateway_name=self.gateway_name,
+                **self.get_extra_kwargs()
+            )
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("history index out of range")
+
+        return self.create_objects(self.array[index:index + 1])[0]
+
+    def __iter__(self) -> Iterator[Union[BarData, TickData]]:
+        """
+        Create data objects chunk by chunk during iteration.
+        """
+        array = self.array
+
+        for start in range(0, len(array), CHUNK_SIZE):
+            for data in self.create_objects(array[start:start + CHUNK_SIZE]):
+                yield data
+
+    def get_datetimes(self, array: np.ndarray) -> List[datetime]:
+        """
+        Convert datetime column into list of datetime objects.
+        """
+        dts = array["datetime"].astype(object)
+
+        tz = self.tz
+        if tz is None:
+            return list(dts)
+        return [dt.replace(tzinfo=tz) for dt in dts]
+
+    def get_extra_kwargs(self) -> dict:
+        """
+        Get extra arguments of constructor used when slicing.
+        """
+        return {}
+
+    def create_objects(self, array: np.ndarray) -> list:
+        """
+        Create data objects from part of structured array.
+        """
+        pass
+
+    def to_list(self) -> list:
+        """
+        Create data objects of all data.
+        """
+        return list(self)
+
+
+class BarHistory(ColumnarHistory):
+    """
+    Columnar history of bar data.
+    """
+
+    dtype = BAR_DTYPE
+    field_names = BAR_FIELDS
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval = None,
+        array: np.ndarray = None,
+        tz: tzinfo = None,
+        gateway_name: str = "DB"
+    ):
+        """"""
+        super().__init__(symbol, exchange, array, tz, gateway_name)
+
+        self.interval: Interval = interval
+
+    def extend(self, datas: Sequence[BarData]) -> None:
+        """"""
+        if datas and not self.interval:
+            self.interval = datas[0].interval
+        super().extend(datas)
+
+    def get_extra_kwargs(self) -> dict:
+        """"""
+        return {"interval": self.interval}
+
+    def resample(
+        self,
+        window: int,
+        interval: Interval = Interval.MINUTE,
+        daily_end: time = None,
+        keep_last: bool = False
+    ) -> "BarHistory":
+        """
+        Generate x minute/x hour/x day bar history from 1 minute bar data.
+        """
+        return BarHistory(
+            self.symbol,
+            self.exchange,
+            interval=interval,
+            array=resample_array(
+                self.array, window, interval, daily_end, keep_last
+            ),
+            tz=self.tz,
+            gateway_name=self.gateway_name
+        )
+
+    def create_objects(self, array: np.ndarray) -> List[BarData]:
+        """"""
+        columns = [array[name].tolist() for name in BAR_FIELDS]
+        gateway_name = self.gateway_name
+        symbol = self.symbol
+        exchange = self.exchange
+        interval = self.interval
+
+        return [
+            CompactBarData(gateway_name, symbol, exchange, dt, interval, *values)
+            for dt, *values in zip(self.get_datetimes(array), *columns)
+        ]
+
+
+class TickHistory(ColumnarHistory):
+    """
+    Columnar history of tick data.
+    """
+
+    dtype = TICK_DTYPE
+    field_names = TICK_FIELDS
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        array: np.ndarray = None,
+        tz: tzinfo = None,
+        gateway_name: str = "DB",
+        name: str = ""
+    ):
+        """"""
+        super().__init__(symbol, exchange, array, tz, gateway_name)
+
+        self.name: str = name
+
+    def extend(self, datas: Sequence[TickData]) -> None:
+        """"""
+        if datas and not self.name:
+            self.name = datas[0].name
+        super().extend(datas)
+
+    def get_extra_kwargs(self) -> dict:
+        """"""
+        return {"name": self.name}
+
+    def create_objects(self, array: np.ndarray) -> List[TickData]:
+        """"""
+        columns = [array[name].tolist() for name in TICK_FIELDS]
+        gateway_name = self.gateway_name
+        symbol = self.symbol
+        exchange = self.exchange
+        name = self.name
+
+        return [
+            CompactTickData(gateway_name, symbol, exchange, dt, name, *values)
+            for dt, *values in zip(self.get_datetimes(array), *columns)
+        ]
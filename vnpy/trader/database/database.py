@@ -4,7 +4,10 @@ from enum import Enum
 from typing import Optional, Sequence, List, Dict, TYPE_CHECKING
 from pytz import timezone
 
+import numpy as np
+
 from vnpy.trader.setting import SETTINGS
+from vnpy.trader.columnar import BarHistory, TickHistory
 
 if TYPE_CHECKING:
     from vnpy.trader.constant import Interval, Exchange  # noqa
@@ -19,6 +22,7 @@ class Driver(Enum):
     MYSQL = "mysql"
     POSTGRESQL = "postgresql"
     MONGODB = "mongodb"
+    COLUMNAR = "columnar"
 
 
 class BaseDatabaseManager(ABC):
@@ -44,6 +48,39 @@ class BaseDatabaseManager(ABC):
     ) -> Sequence["TickData"]:
         pass
 
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval",
+        start: datetime,
+        end: datetime
+    ) -> np.ndarray:
+        """
+        Load bar data as structured array of BAR_DTYPE, with naive
+        datetime in database timezone.
+        """
+        history = BarHistory(symbol, exchange, interval)
+        history.extend(
+            self.load_bar_data(symbol, exchange, interval, start, end)
+        )
+        return history.array
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        start: datetime,
+        end: datetime
+    ) -> np.ndarray:
+        """
+        Load tick data as structured array of TICK_DTYPE, with naive
+        datetime in database timezone.
+        """
+        history = TickHistory(symbol, exchange)
+        history.extend(self.load_tick_data(symbol, exchange, start, end))
+        return history.array
+
     @abstractmethod
     def save_bar_data(
         self,
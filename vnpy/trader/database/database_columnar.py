@@ -0,0 +1,391 @@
+"""
+Columnar database on local disk.
+
+Data of each contract is partitioned by date and saved as NumPy .npy
+files of structured array:
+
+    {root}/bar/{exchange}/{quoted symbol}/{interval}/{yyyymm}.npy
+    {root}/tick/{exchange}/{quoted symbol}/{yyyymmdd}.npy
+
+Partitions are read with memory map, and count/start/end of every
+partition are kept in meta.json of the folder, so statistics and range
+queries do not need to read the data.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+from vnpy.trader.columnar import (
+    BAR_DTYPE, BAR_FIELDS, TICK_DTYPE, TICK_FIELDS, sort_unique, write_atomic
+)
+from vnpy.trader.utility import get_folder_path
+
+from .database import BaseDatabaseManager, Driver, DB_TZ
+
+
+META_FILENAME = "meta.json"
+
+
+def init(_: Driver, settings: dict):
+    database = settings["database"]
+
+    if os.path.isabs(database):
+        path = Path(database)
+    else:
+        path = get_folder_path(database)
+
+    return ColumnarManager(path)
+
+
+def to_db_datetime(dt: datetime) -> np.datetime64:
+    """
+    Convert datetime into naive time in database timezone.
+    """
+    if dt.tzinfo:
+        dt = dt.astimezone(DB_TZ).replace(tzinfo=None)
+    return np.datetime64(dt, "us")
+
+
+def quote_symbol(symbol: str) -> str:
+    """
+    Quote symbol into folder name, without path separator or glob
+    characters (e.g. BTC/USDT into BTC%2FUSDT).
+    """
+    return quote(symbol, safe="")
+
+
+def to_array(datas: Sequence, dtype: np.dtype, field_names: List[str]) -> np.ndarray:
+    """
+    Convert data objects into structured array.
+    """
+    array = np.empty(len(datas), dtype=dtype)
+    array["datetime"] = [
+        d.datetime.astimezone(DB_TZ).replace(tzinfo=None) for d in datas
+    ]
+    for name in field_names:
+        array[name] = [getattr(d, name) for d in datas]
+    return array
+
+
+class Series:
+    """
+    Partitioned data of one contract (and interval).
+    """
+
+    def __init__(self, path: Path, dtype: np.dtype, partition_unit: str):
+        """"""
+        self.path: Path = path
+        self.dtype: np.dtype = dtype
+        self.partition_unit: str = partition_unit
+
+        self.meta: dict = {}
+        meta_path = path.joinpath(META_FILENAME)
+        if meta_path.exists():
+            with open(meta_path, encoding="UTF-8") as f:
+                self.meta = json.load(f)
+
+    @property
+    def partitions(self) -> Dict[str, dict]:
+        """"""
+        return self.meta.setdefault("partitions", {})
+
+    def get_count(self) -> int:
+        """"""
+        return sum([p["count"] for p in self.partitions.values()])
+
+    def save(self, array: np.ndarray, info: dict) -> None:
+        """
+        Save structured array sorted by datetime into partitions.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.meta.update(info)
+
+        keys = array["datetime"].astype(f"datetime64[{self.partition_unit}]")
+        bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+
+        for part in np.split(array, bounds):
+            key = str(part["datetime"][0].astype(f"datetime64[{self.partition_unit}]"))
+            key = key.replace("-", "")
+
+            path = self.path.joinpath(f"{key}.npy")
+            if path.exists():
+                part = sort_unique(np.concatenate([np.load(path), part]))
+
+            write_atomic(path, lambda f: np.save(f, part))
+
+            self.partitions[key] = {
+                "count": len(part),
+                "start": str(part["datetime"][0]),
+                "end": str(part["datetime"][-1])
+            }
+
+        self.meta["partitions"] = dict(sorted(self.partitions.items()))
+        write_atomic(
+            self.path.joinpath(META_FILENAME),
+            lambda f: f.write(json.dumps(self.meta, indent=4).encode("UTF-8"))
+        )
+
+    def iter_arrays(self, start: datetime, end: datetime) -> Iterator[np.ndarray]:
+        """
+        Yield memory mapped array of partitions within range.
+        """
+        start = to_db_datetime(start)
+        end = to_db_datetime(end)
+
+        for key, partition in self.partitions.items():
+            if (
+                np.datetime64(partition["end"]) < start
+                or np.datetime64(partition["start"]) > end
+            ):
+                continue
+
+            array = np.load(self.path.joinpath(f"{key}.npy"), mmap_mode="r")
+
+            datetimes = array["datetime"]
+            left = np.searchsorted(datetimes, start, side="left")
+            right = np.searchsorted(datetimes, end, side="right")
+            yield array[left:right]
+
+    def load(self, start: datetime, end: datetime) -> np.ndarray:
+        """
+        Load data within range into memory.
+        """
+        arrays = list(self.iter_arrays(start, end))
+        if not arrays:
+            return np.empty(0, dtype=self.dtype)
+        return np.concatenate(arrays)
+
+    def load_row(self, newest: bool) -> Optional[np.ndarray]:
+        """
+        Load the newest/oldest row.
+        """
+        if not self.partitions:
+            return None
+
+        keys = list(self.partitions.keys())
+        key = keys[-1] if newest else keys[0]
+
+        array = np.load(self.path.joinpath(f"{key}.npy"), mmap_mode="r")
+        index = -1 if newest else 0
+        return array[[index]]
+
+
+class ColumnarManager(BaseDatabaseManager):
+
+    def __init__(self, path: Path):
+        self.path: Path = path
+        self.lock: Lock = Lock()
+
+    def get_bar_series(
+        self, symbol: str, exchange: Exchange, interval: Interval
+    ) -> Series:
+        """"""
+        path = self.path.joinpath("bar", exchange.value, quote_symbol(symbol), interval.value)
+        return Series(path, BAR_DTYPE, "M")
+
+    def get_tick_series(self, symbol: str, exchange: Exchange) -> Series:
+        """"""
+        path = self.path.joinpath("tick", exchange.value, quote_symbol(symbol))
+        return Series(path, TICK_DTYPE, "D")
+
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> np.ndarray:
+        with self.lock:
+            series = self.get_bar_series(symbol, exchange, interval)
+            return series.load(start, end)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> np.ndarray:
+        with self.lock:
+            series = self.get_tick_series(symbol, exchange)
+            return series.load(start, end)
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> Sequence[BarData]:
+        array = self.load_bar_array(symbol, exchange, interval, start, end)
+        return self.to_bars(array, symbol, exchange, interval)
+
+    def load_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> Sequence[TickData]:
+        with self.lock:
+            series = self.get_tick_series(symbol, exchange)
+            array = series.load(start, end)
+            name = series.meta.get("name", "")
+
+        return self.to_ticks(array, symbol, exchange, name)
+
+    def to_bars(
+        self,
+        array: np.ndarray,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> List[BarData]:
+        """"""
+        datetimes = array["datetime"].astype(object)
+        columns = [array[name].tolist() for name in BAR_FIELDS]
+
+        return [
+            BarData("DB", symbol, exchange, dt.replace(tzinfo=DB_TZ), interval, *values)
+            for dt, *values in zip(datetimes, *columns)
+        ]
+
+    def to_ticks(
+        self,
+        array: np.ndarray,
+        symbol: str,
+        exchange: Exchange,
+        name: str
+    ) -> List[TickData]:
+        """"""
+        datetimes = array["datetime"].astype(object)
+        columns = [array[name].tolist() for name in TICK_FIELDS]
+
+        return [
+            TickData("DB", symbol, exchange, dt.replace(tzinfo=DB_TZ), name, *values)
+            for dt, *values in zip(datetimes, *columns)
+        ]
+
+    def save_bar_data(self, datas: Sequence[BarData]):
+        groups: Dict[tuple, List[BarData]] = {}
+        for bar in datas:
+            key = (bar.symbol, bar.exchange, bar.interval)
+            groups.setdefault(key, []).append(bar)
+
+        with self.lock:
+            for (symbol, exchange, interval), bars in groups.items():
+                array = sort_unique(to_array(bars, BAR_DTYPE, BAR_FIELDS))
+
+                series = self.get_bar_series(symbol, exchange, interval)
+                series.save(array, {
+                    "symbol": symbol,
+                    "exchange": exchange.value,
+                    "interval": interval.value
+                })
+
+    def save_tick_data(self, datas: Sequence[TickData]):
+        groups: Dict[tuple, List[TickData]] = {}
+        for tick in datas:
+            key = (tick.symbol, tick.exchange)
+            groups.setdefault(key, []).append(tick)
+
+        with self.lock:
+            for (symbol, exchange), ticks in groups.items():
+                array = sort_unique(to_array(ticks, TICK_DTYPE, TICK_FIELDS))
+
+                series = self.get_tick_series(symbol, exchange)
+                series.save(array, {
+                    "symbol": symbol,
+                    "exchange": exchange.value,
+                    "name": ticks[-1].name
+                })
+
+    def get_newest_bar_data(
+        self, symbol: str, exchange: "Exchange", interval: "Interval"
+    ) -> Optional["BarData"]:
+        with self.lock:
+            array = self.get_bar_series(symbol, exchange, interval).load_row(True)
+
+        if array is None:
+            return None
+        return self.to_bars(array, symbol, exchange, interval)[0]
+
+    def get_oldest_bar_data(
+        self, symbol: str, exchange: "Exchange", interval: "Interval"
+    ) -> Optional["BarData"]:
+        with self.lock:
+            array = self.get_bar_series(symbol, exchange, interval).load_row(False)
+
+        if array is None:
+            return None
+        return self.to_bars(array, symbol, exchange, interval)[0]
+
+    def get_newest_tick_data(
+        self, symbol: str, exchange: "Exchange"
+    ) -> Optional["TickData"]:
+        with self.lock:
+            series = self.get_tick_series(symbol, exchange)
+            array = series.load_row(True)
+
+        if array is None:
+            return None
+        return self.to_ticks(array, symbol, exchange, series.meta.get("name", ""))[0]
+
+    def get_bar_data_statistics(self) -> List[Dict]:
+        """"""
+        result = []
+
+        with self.lock:
+            for meta_path in sorted(self.path.glob(f"bar/*/*/*/{META_FILENAME}")):
+                series = Series(meta_path.parent, BAR_DTYPE, "M")
+                count = series.get_count()
+
+                if count:
+                    result.append({
+                        "symbol": series.meta["symbol"],
+                        "exchange": series.meta["exchange"],
+                        "interval": series.meta["interval"],
+                        "count": count
+                    })
+
+        return result
+
+    def delete_bar_data(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval"
+    ) -> int:
+        """
+        Delete all bar data with given symbol + exchange + interval.
+        """
+        with self.lock:
+            series = self.get_bar_series(symbol, exchange, interval)
+            count = series.get_count()
+
+            if series.path.exists():
+                shutil.rmtree(series.path)
+
+        return count
+
+    def clean(self, symbol: str):
+        name = quote_symbol(symbol)
+
+        with self.lock:
+            for path in self.path.glob(f"bar/*/{name}"):
+                shutil.rmtree(path)
+
+            for path in self.path.glob(f"tick/*/{name}"):
+                shutil.rmtree(path)
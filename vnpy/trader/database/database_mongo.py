@@ -1,15 +1,22 @@
 from datetime import datetime
-from enum import Enum
-from typing import Optional, Sequence, List
+from typing import Iterator, Optional, Sequence, List
 
+import numpy as np
 from mongoengine import DateTimeField, Document, FloatField, StringField, connect
+from pymongo import ASCENDING, UpdateOne
+from pymongo.collection import Collection
 
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
+from vnpy.trader.columnar import BAR_DTYPE, BAR_FIELDS, TICK_DTYPE, TICK_FIELDS
 
 from .database import BaseDatabaseManager, Driver, DB_TZ
 
 
+# Number of documents sent/received in one batch
+BULK_SIZE: int = 10_000
+
+
 def init(_: Driver, settings: dict):
     database = settings["database"]
     host = settings["host"]
@@ -191,8 +198,94 @@ class DbTickData(Document):
         return tick
 
 
+def find_chunks(
+    collection: Collection,
+    query: dict,
+    fields: List[str],
+    chunk_size: int = BULK_SIZE
+) -> Iterator[List[tuple]]:
+    """
+    Find documents sorted by datetime with projection of fields, and
+    yield rows of (datetime, *fields) chunk by chunk.
+    """
+    projection = {"_id": False, "datetime": True}
+    projection.update({name: True for name in fields})
+
+    cursor = (
+        collection.find(query, projection)
+        .sort("datetime", ASCENDING)
+        .batch_size(chunk_size)
+    )
+
+    defaults = [(name, "" if name == "name" else 0) for name in fields]
+    rows = []
+
+    for d in cursor:
+        rows.append(
+            (d["datetime"], *[d.get(name, default) for name, default in defaults])
+        )
+
+        if len(rows) == chunk_size:
+            yield rows
+            rows = []
+
+    if rows:
+        yield rows
+
+
+def bulk_upsert(collection: Collection, requests: List[UpdateOne]) -> None:
+    """
+    Send upsert requests in unordered batches.
+    """
+    for i in range(0, len(requests), BULK_SIZE):
+        collection.bulk_write(requests[i:i + BULK_SIZE], ordered=False)
+
+
 class MongoManager(BaseDatabaseManager):
 
+    def select_bar_rows(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Iterator[List[tuple]]:
+        """
+        Yield chunks of rows with datetime and BAR_FIELDS.
+        """
+        query = {
+            "symbol": symbol,
+            "exchange": exchange.value,
+            "interval": interval.value,
+            "datetime": {"$gte": start, "$lte": end}
+        }
+        return find_chunks(DbBarData._get_collection(), query, BAR_FIELDS)
+
+    def select_tick_rows(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        with_name: bool = False
+    ) -> Iterator[List[tuple]]:
+        """
+        Yield chunks of rows with datetime, name (if with_name) and
+        TICK_FIELDS.
+        """
+        query = {
+            "symbol": symbol,
+            "exchange": exchange.value,
+            "datetime": {"$gte": start, "$lte": end}
+        }
+
+        fields = TICK_FIELDS
+        if with_name:
+            fields = ["name"] + fields
+
+        return find_chunks(DbTickData._get_collection(), query, fields)
+
     def load_bar_data(
         self,
         symbol: str,
@@ -201,60 +294,93 @@ class MongoManager(BaseDatabaseManager):
         start: datetime,
         end: datetime,
     ) -> Sequence[BarData]:
-        s = DbBarData.objects(
-            symbol=symbol,
-            exchange=exchange.value,
-            interval=interval.value,
-            datetime__gte=start,
-            datetime__lte=end,
-        )
-        data = [db_bar.to_bar() for db_bar in s]
+        data = []
+
+        for rows in self.select_bar_rows(symbol, exchange, interval, start, end):
+            data.extend([
+                BarData("DB", symbol, exchange, dt.replace(tzinfo=DB_TZ), interval, *values)
+                for dt, *values in rows
+            ])
+
         return data
 
     def load_tick_data(
         self, symbol: str, exchange: Exchange, start: datetime, end: datetime
     ) -> Sequence[TickData]:
-        s = DbTickData.objects(
-            symbol=symbol,
-            exchange=exchange.value,
-            datetime__gte=start,
-            datetime__lte=end,
-        )
-        data = [db_tick.to_tick() for db_tick in s]
+        data = []
+
+        for rows in self.select_tick_rows(symbol, exchange, start, end, True):
+            data.extend([
+                TickData("DB", symbol, exchange, dt.replace(tzinfo=DB_TZ), *values)
+                for dt, *values in rows
+            ])
+
         return data
 
-    @staticmethod
-    def to_update_param(d) -> dict:
-        dt = d.datetime.astimezone(DB_TZ)
-        d.datetime = dt.replace(tzinfo=None)
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> np.ndarray:
+        arrays = [
+            np.array(rows, dtype=BAR_DTYPE)
+            for rows in self.select_bar_rows(symbol, exchange, interval, start, end)
+        ]
+
+        if not arrays:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.concatenate(arrays)
 
-        param = {
-            "set__" + k: v.value if isinstance(v, Enum) else v
-            for k, v in d.__dict__.items()
-        }
-        return param
+    def load_tick_array(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> np.ndarray:
+        arrays = [
+            np.array(rows, dtype=TICK_DTYPE)
+            for rows in self.select_tick_rows(symbol, exchange, start, end)
+        ]
+
+        if not arrays:
+            return np.empty(0, dtype=TICK_DTYPE)
+        return np.concatenate(arrays)
 
     def save_bar_data(self, datas: Sequence[BarData]):
+        requests = []
+
         for d in datas:
-            updates = self.to_update_param(d)
-            updates.pop("set__gateway_name")
-            updates.pop("set__vt_symbol")
-            (
-                DbBarData.objects(
-                    symbol=d.symbol, interval=d.interval.value, datetime=d.datetime
-                ).update_one(upsert=True, **updates)
-            )
+            key = {
+                "symbol": d.symbol,
+                "exchange": d.exchange.value,
+                "interval": d.interval.value,
+                "datetime": d.datetime.astimezone(DB_TZ).replace(tzinfo=None)
+            }
+
+            document = {name: getattr(d, name) for name in BAR_FIELDS}
+            document.update(key)
+
+            requests.append(UpdateOne(key, {"$set": document}, upsert=True))
+
+        bulk_upsert(DbBarData._get_collection(), requests)
 
     def save_tick_data(self, datas: Sequence[TickData]):
+        requests = []
+
         for d in datas:
-            updates = self.to_update_param(d)
-            updates.pop("set__gateway_name")
-            updates.pop("set__vt_symbol")
-            (
-                DbTickData.objects(
-                    symbol=d.symbol, exchange=d.exchange.value, datetime=d.datetime
-                ).update_one(upsert=True, **updates)
-            )
+            key = {
+                "symbol": d.symbol,
+                "exchange": d.exchange.value,
+                "datetime": d.datetime.astimezone(DB_TZ).replace(tzinfo=None)
+            }
+
+            document = {name: getattr(d, name) for name in TICK_FIELDS}
+            document["name"] = d.name
+            document.update(key)
+
+            requests.append(UpdateOne(key, {"$set": document}, upsert=True))
+
+        bulk_upsert(DbTickData._get_collection(), requests)
 
     def get_newest_bar_data(
         self, symbol: str, exchange: "Exchange", interval: "Interval"
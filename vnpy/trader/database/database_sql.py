@@ -1,7 +1,10 @@
 """"""
+import csv
 from datetime import datetime
-from typing import List, Dict, Optional, Sequence, Type
+from io import StringIO
+from typing import Iterator, List, Dict, Optional, Sequence, Type
 
+import numpy as np
 from peewee import (
     AutoField,
     CharField,
@@ -18,6 +21,7 @@ from peewee import (
 
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
+from vnpy.trader.columnar import BAR_DTYPE, BAR_FIELDS, TICK_DTYPE, TICK_FIELDS
 from vnpy.trader.utility import get_file_path
 
 from .database import BaseDatabaseManager, Driver, DB_TZ
@@ -33,7 +37,7 @@ def init(driver: Driver, settings: dict):
 
     db = init_funcs[driver](settings)
     bar, tick = init_models(db, driver)
-    return SqlManager(bar, tick)
+    return SqlManager(bar, tick, driver)
 
 
 def init_sqlite(settings: dict):
@@ -57,6 +61,216 @@ def init_postgresql(settings: dict):
     return db
 
 
+BAR_COLUMNS: List[str] = [
+    "symbol", "exchange", "datetime", "interval",
+    "volume", "open_interest",
+    "open_price", "high_price", "low_price", "close_price"
+]
+
+TICK_COLUMNS: List[str] = [
+    "symbol", "exchange", "datetime", "name",
+    "volume", "open_interest", "last_price", "last_volume",
+    "limit_up", "limit_down",
+    "open_price", "high_price", "low_price", "pre_close",
+    "bid_price_1", "bid_price_2", "bid_price_3", "bid_price_4", "bid_price_5",
+    "ask_price_1", "ask_price_2", "ask_price_3", "ask_price_4", "ask_price_5",
+    "bid_volume_1", "bid_volume_2", "bid_volume_3", "bid_volume_4", "bid_volume_5",
+    "ask_volume_1", "ask_volume_2", "ask_volume_3", "ask_volume_4", "ask_volume_5",
+]
+
+# Number of rows sent to database in one batch
+BULK_SIZE: int = 10_000
+
+
+def get_bar_row(bar: BarData) -> tuple:
+    """
+    Convert BarData into row of BAR_COLUMNS.
+    """
+    # Change datetime to database timezone, then
+    # remove tzinfo since not supported by SQLite.
+    dt = bar.datetime.astimezone(DB_TZ).replace(tzinfo=None)
+
+    return (
+        bar.symbol, bar.exchange.value, dt, bar.interval.value,
+        bar.volume, bar.open_interest,
+        bar.open_price, bar.high_price, bar.low_price, bar.close_price
+    )
+
+
+def get_tick_row(tick: TickData) -> tuple:
+    """
+    Convert TickData into row of TICK_COLUMNS.
+    """
+    dt = tick.datetime.astimezone(DB_TZ).replace(tzinfo=None)
+
+    row = (
+        tick.symbol, tick.exchange.value, dt, tick.name,
+        tick.volume, tick.open_interest, tick.last_price, tick.last_volume,
+        tick.limit_up, tick.limit_down,
+        tick.open_price, tick.high_price, tick.low_price, tick.pre_close
+    )
+
+    # Depth after level 1 is saved as NULL if not available
+    if tick.bid_price_2:
+        return row + (
+            tick.bid_price_1, tick.bid_price_2, tick.bid_price_3,
+            tick.bid_price_4, tick.bid_price_5,
+            tick.ask_price_1, tick.ask_price_2, tick.ask_price_3,
+            tick.ask_price_4, tick.ask_price_5,
+            tick.bid_volume_1, tick.bid_volume_2, tick.bid_volume_3,
+            tick.bid_volume_4, tick.bid_volume_5,
+            tick.ask_volume_1, tick.ask_volume_2, tick.ask_volume_3,
+            tick.ask_volume_4, tick.ask_volume_5,
+        )
+    else:
+        return row + (
+            tick.bid_price_1, None, None, None, None,
+            tick.ask_price_1, None, None, None, None,
+            tick.bid_volume_1, None, None, None, None,
+            tick.ask_volume_1, None, None, None, None,
+        )
+
+
+def quote(db: Database, name: str) -> str:
+    """
+    Quote table/column name for database.
+    """
+    return db.quote[0] + name + db.quote[1]
+
+
+def bulk_save(
+    db: Database,
+    driver: Driver,
+    model: Type[Model],
+    columns: List[str],
+    rows: List[tuple],
+    conflict_target: List[str]
+) -> None:
+    """
+    Save rows into table of model in bulk, replace if exists.
+
+    1. SQLite/MySQL: executemany of INSERT OR REPLACE/REPLACE INTO
+    2. PostgreSQL: COPY into staging table, then merge into table
+    with INSERT ... ON CONFLICT DO UPDATE
+    """
+    if not rows:
+        return
+
+    if driver is Driver.POSTGRESQL:
+        save_postgresql(db, model, columns, rows, conflict_target)
+        return
+
+    if driver is Driver.SQLITE:
+        command = "INSERT OR REPLACE"
+    else:
+        command = "REPLACE"
+
+    table = quote(db, model._meta.table_name)
+    names = ", ".join([quote(db, c) for c in columns])
+    params = ", ".join([db.param] * len(columns))
+    sql = f"{command} INTO {table} ({names}) VALUES ({params})"
+
+    with db.atomic():
+        cursor = db.cursor()
+        for c in chunked(rows, BULK_SIZE):
+            cursor.executemany(sql, c)
+
+
+def save_postgresql(
+    db: Database,
+    model: Type[Model],
+    columns: List[str],
+    rows: List[tuple],
+    conflict_target: List[str]
+) -> None:
+    """"""
+    # One statement cannot update the same row twice, keep the last one
+    keys = [columns.index(c) for c in conflict_target]
+    unique_rows = {tuple([row[i] for i in keys]): row for row in rows}
+
+    table = quote(db, model._meta.table_name)
+    staging = quote(db, model._meta.table_name + "_staging")
+    names = ", ".join([quote(db, c) for c in columns])
+    targets = ", ".join([quote(db, c) for c in conflict_target])
+    updates = ", ".join([
+        f"{quote(db, c)} = EXCLUDED.{quote(db, c)}" for c in columns
+        if c not in conflict_target
+    ])
+
+    with db.atomic():
+        cursor = db.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.execute(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {names} FROM {table} WITH NO DATA"
+        )
+
+        for c in chunked(unique_rows.values(), BULK_SIZE):
+            if hasattr(cursor, "copy_expert"):
+                buf = StringIO()
+                csv.writer(buf).writerows(c)
+                buf.seek(0)
+                cursor.copy_expert(
+                    f"COPY {staging} ({names}) FROM STDIN WITH (FORMAT csv)",
+                    buf
+                )
+            else:
+                params = ", ".join([db.param] * len(columns))
+                cursor.executemany(
+                    f"INSERT INTO {staging} ({names}) VALUES ({params})", c
+                )
+
+        cursor.execute(
+            f"INSERT INTO {table} ({names}) SELECT {names} FROM {staging} "
+            f"ON CONFLICT ({targets}) DO UPDATE SET {updates}"
+        )
+
+
+def select_chunks(
+    db: Database,
+    driver: Driver,
+    query,
+    chunk_size: int = BULK_SIZE
+) -> Iterator[List[tuple]]:
+    """
+    Execute select query and yield raw row tuples chunk by chunk.
+
+    Server side cursor is used for PostgreSQL/MySQL, so that rows are
+    not all fetched into client memory at once.
+    """
+    sql, params = query.sql()
+
+    with db.atomic():
+        if driver is Driver.POSTGRESQL:
+            cursor = db.connection().cursor(name="vnpy_select_chunks")
+            cursor.itersize = chunk_size
+        elif driver is Driver.MYSQL:
+            from pymysql.cursors import SSCursor
+            cursor = db.connection().cursor(SSCursor)
+        else:
+            cursor = db.cursor()
+
+        try:
+            cursor.execute(sql, params)
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+
+def to_datetime(value) -> datetime:
+    """
+    Convert raw value of datetime field, which is str in SQLite.
+    """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
 class ModelBase(Model):
 
     def to_dict(self):
@@ -137,23 +351,24 @@ def init_models(db: Database, driver: Driver):
             """
             save a list of objects, update if exists.
             """
-            dicts = [i.to_dict() for i in objs]
-            with db.atomic():
-                if driver is Driver.POSTGRESQL:
-                    for bar in dicts:
-                        DbBarData.insert(bar).on_conflict(
-                            update=bar,
-                            conflict_target=(
-                                DbBarData.symbol,
-                                DbBarData.exchange,
-                                DbBarData.interval,
-                                DbBarData.datetime,
-                            ),
-                        ).execute()
-                else:
-                    for c in chunked(dicts, 50):
-                        DbBarData.insert_many(
-                            c).on_conflict_replace().execute()
+            rows = [
+                tuple([i.__data__.get(c) for c in BAR_COLUMNS]) for i in objs
+            ]
+            DbBarData.bulk_save(rows)
+
+        @staticmethod
+        def bulk_save(rows: List[tuple]):
+            """
+            save a list of rows of BAR_COLUMNS, update if exists.
+            """
+            bulk_save(
+                db,
+                driver,
+                DbBarData,
+                BAR_COLUMNS,
+                rows,
+                ["symbol", "exchange", "interval", "datetime"]
+            )
 
     class DbTickData(ModelBase):
         """
@@ -315,21 +530,24 @@ def init_models(db: Database, driver: Driver):
 
         @staticmethod
         def save_all(objs: List["DbTickData"]):
-            dicts = [i.to_dict() for i in objs]
-            with db.atomic():
-                if driver is Driver.POSTGRESQL:
-                    for tick in dicts:
-                        DbTickData.insert(tick).on_conflict(
-                            update=tick,
-                            conflict_target=(
-                                DbTickData.symbol,
-                                DbTickData.exchange,
-                                DbTickData.datetime,
-                            ),
-                        ).execute()
-                else:
-                    for c in chunked(dicts, 50):
-                        DbTickData.insert_many(c).on_conflict_replace().execute()
+            rows = [
+                tuple([i.__data__.get(c) for c in TICK_COLUMNS]) for i in objs
+            ]
+            DbTickData.bulk_save(rows)
+
+        @staticmethod
+        def bulk_save(rows: List[tuple]):
+            """
+            save a list of rows of TICK_COLUMNS, update if exists.
+            """
+            bulk_save(
+                db,
+                driver,
+                DbTickData,
+                TICK_COLUMNS,
+                rows,
+                ["symbol", "exchange", "datetime"]
+            )
 
     db.connect()
     db.create_tables([DbBarData, DbTickData])
@@ -338,20 +556,33 @@ def init_models(db: Database, driver: Driver):
 
 class SqlManager(BaseDatabaseManager):
 
-    def __init__(self, class_bar: Type[Model], class_tick: Type[Model]):
+    def __init__(
+        self,
+        class_bar: Type[Model],
+        class_tick: Type[Model],
+        driver: Driver = Driver.SQLITE
+    ):
         self.class_bar = class_bar
         self.class_tick = class_tick
+        self.driver = driver
 
-    def load_bar_data(
+    def select_bar_rows(
         self,
         symbol: str,
         exchange: Exchange,
         interval: Interval,
         start: datetime,
         end: datetime,
-    ) -> Sequence[BarData]:
+    ) -> Iterator[List[tuple]]:
+        """
+        Yield chunks of raw rows with datetime and BAR_FIELDS columns.
+        """
+        columns = [self.class_bar.datetime] + [
+            getattr(self.class_bar, name) for name in BAR_FIELDS
+        ]
+
         s = (
-            self.class_bar.select()
+            self.class_bar.select(*columns)
                 .where(
                 (self.class_bar.symbol == symbol)
                 & (self.class_bar.exchange == exchange.value)
@@ -361,14 +592,34 @@ class SqlManager(BaseDatabaseManager):
             )
             .order_by(self.class_bar.datetime)
         )
-        data = [db_bar.to_bar() for db_bar in s]
-        return data
+        return select_chunks(self.class_bar._meta.database, self.driver, s)
+
+    def select_tick_rows(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        with_name: bool = False
+    ) -> Iterator[List[tuple]]:
+        """
+        Yield chunks of raw rows with datetime, name (if with_name) and
+        TICK_FIELDS columns.
+        """
+        columns = [self.class_tick.datetime]
+        if with_name:
+            columns.append(self.class_tick.name)
+
+        # Depth after level 1 may be NULL
+        for name in TICK_FIELDS:
+            field = getattr(self.class_tick, name)
+            if field.null:
+                columns.append(fn.COALESCE(field, 0))
+            else:
+                columns.append(field)
 
-    def load_tick_data(
-        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
-    ) -> Sequence[TickData]:
         s = (
-            self.class_tick.select()
+            self.class_tick.select(*columns)
                 .where(
                 (self.class_tick.symbol == symbol)
                 & (self.class_tick.exchange == exchange.value)
@@ -377,17 +628,88 @@ class SqlManager(BaseDatabaseManager):
             )
             .order_by(self.class_tick.datetime)
         )
+        return select_chunks(self.class_tick._meta.database, self.driver, s)
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Sequence[BarData]:
+        data = []
+
+        for rows in self.select_bar_rows(symbol, exchange, interval, start, end):
+            data.extend([
+                BarData(
+                    "DB",
+                    symbol,
+                    exchange,
+                    to_datetime(dt).replace(tzinfo=DB_TZ),
+                    interval,
+                    *values
+                )
+                for dt, *values in rows
+            ])
 
-        data = [db_tick.to_tick() for db_tick in s]
         return data
 
+    def load_tick_data(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> Sequence[TickData]:
+        data = []
+
+        for rows in self.select_tick_rows(symbol, exchange, start, end, True):
+            data.extend([
+                TickData(
+                    "DB",
+                    symbol,
+                    exchange,
+                    to_datetime(dt).replace(tzinfo=DB_TZ),
+                    *values
+                )
+                for dt, *values in rows
+            ])
+
+        return data
+
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> np.ndarray:
+        arrays = [
+            np.array(rows, dtype=BAR_DTYPE)
+            for rows in self.select_bar_rows(symbol, exchange, interval, start, end)
+        ]
+
+        if not arrays:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.concatenate(arrays)
+
+    def load_tick_array(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> np.ndarray:
+        arrays = [
+            np.array(rows, dtype=TICK_DTYPE)
+            for rows in self.select_tick_rows(symbol, exchange, start, end)
+        ]
+
+        if not arrays:
+            return np.empty(0, dtype=TICK_DTYPE)
+        return np.concatenate(arrays)
+
     def save_bar_data(self, datas: Sequence[BarData]):
-        ds = [self.class_bar.from_bar(i) for i in datas]
-        self.class_bar.save_all(ds)
+        rows = [get_bar_row(i) for i in datas]
+        self.class_bar.bulk_save(rows)
 
     def save_tick_data(self, datas: Sequence[TickData]):
-        ds = [self.class_tick.from_tick(i) for i in datas]
-        self.class_tick.save_all(ds)
+        rows = [get_tick_row(i) for i in datas]
+        self.class_tick.bulk_save(rows)
 
     def get_newest_bar_data(
         self, symbol: str, exchange: "Exchange", interval: "Interval"
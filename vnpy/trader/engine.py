@@ -317,8 +317,11 @@ class LogEngine(BaseEngine):
         self.logger.addHandler(file_handler)
 
     def register_event(self) -> None:
-        """"""
-        self.event_engine.register(EVENT_LOG, self.process_log_event)
+        """
+        Log output (console/file) runs in a separate lane to keep it
+        from delaying order and trade events.
+        """
+        self.event_engine.register(EVENT_LOG, self.process_log_event, lane="log")
 
     def process_log_event(self, event: Event) -> None:
         """
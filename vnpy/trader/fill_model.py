@@ -0,0 +1,282 @@
+"""
+Fill models of limit orders in tick backtesting.
+"""
+
+from datetime import timedelta
+from typing import Dict, Set, Tuple
+
+from .constant import Direction
+from .object import TickData
+
+
+class FillModel:
+    """
+    Decides whether and how much a resting limit order is filled by
+    each new tick.
+
+    Default model fills the whole order at once when its price crosses
+    the best price of the opposite side, at the better one of order
+    price and best price.
+
+    Latency is the time between order/cancel sent by strategy and
+    arrived at exchange, order can only be filled after arrived and can
+    still be filled before cancel arrived.
+    """
+
+    def __init__(self, latency: timedelta = timedelta()):
+        """"""
+        self.latency: timedelta = latency
+        self.tick: TickData = None
+
+    def __repr__(self) -> str:
+        """"""
+        return f"{self.__class__.__name__}(latency={self.latency})"
+
+    def clear(self) -> None:
+        """
+        Clear state of last backtesting.
+        """
+        self.tick = None
+
+    def update_tick(self, tick: TickData) -> None:
+        """
+        Update new tick before matching orders.
+        """
+        self.tick = tick
+
+    def get_long_bound(self) -> float:
+        """
+        Only long orders with price >= bound can be filled, return 0 if
+        no long order can be filled.
+        """
+        return self.tick.ask_price_1
+
+    def get_short_bound(self) -> float:
+        """
+        Only short orders with price <= bound can be filled, return 0 if
+        no short order can be filled.
+        """
+        return self.tick.bid_price_1
+
+    def add_order(self, orderid: str, direction: Direction, price: float) -> None:
+        """
+        Order arrived at exchange.
+        """
+        pass
+
+    def remove_order(self, orderid: str) -> None:
+        """
+        Order finished (filled or cancelled).
+        """
+        pass
+
+    def match_order(
+        self,
+        orderid: str,
+        direction: Direction,
+        price: float,
+        volume: float
+    ) -> Tuple[float, float]:
+        """
+        Match order of remaining volume with current tick.
+
+        :return: (trade price, trade volume), trade volume is 0 if not
+        filled
+        """
+        tick = self.tick
+
+        if direction == Direction.LONG:
+            if tick.ask_price_1 and price >= tick.ask_price_1:
+                return min(price, tick.ask_price_1), volume
+        else:
+            if tick.bid_price_1 and price <= tick.bid_price_1:
+                return max(price, tick.bid_price_1), volume
+
+        return 0, 0
+
+
+class QueueFillModel(FillModel):
+    """
+    Level 2 queue position model:
+    1. order crossing best price of the opposite side is filled as taker
+    at best price, volume limited by best volume
+    2. order waiting at its price level has volume ahead in queue, which
+    starts from volume of the level (5 levels of depth) when order
+    arrived, or 0 if order makes a new best price
+    3. volume ahead is reduced by volume traded (tick volume change) at
+    the order price, and order is filled partially by the rest of traded
+    volume
+    4. volume ahead is capped by volume of the level when it is the best
+    level, assuming cancelled volume was ahead of the order
+    5. order is filled fully when price traded through its price
+    6. volume of each price level filled into orders is allocated in
+    order of matching within one tick, so it is not shared by orders
+    """
+
+    def __init__(self, latency: timedelta = timedelta()):
+        """"""
+        super().__init__(latency)
+
+        self.queues: Dict[str, float] = {}     # orderid: volume ahead
+        self.new_orderids: Set[str] = set()    # orders arrived at current tick
+
+        self.last_volume: float = 0
+        self.traded: float = 0
+
+        # (direction, price): volume filled into orders at current tick
+        self.allocated: Dict[Tuple[Direction, float], float] = {}
+
+    def clear(self) -> None:
+        """"""
+        super().clear()
+
+        self.queues.clear()
+        self.new_orderids.clear()
+        self.last_volume = 0
+        self.traded = 0
+        self.allocated.clear()
+
+    def update_tick(self, tick: TickData) -> None:
+        """"""
+        # Volume restarts from 0 on new trading day
+        if self.tick and tick.volume >= self.last_volume:
+            self.traded = tick.volume - self.last_volume
+        else:
+            self.traded = 0
+
+        self.last_volume = tick.volume
+        self.tick = tick
+        self.new_orderids.clear()
+        self.allocated.clear()
+
+    def get_long_bound(self) -> float:
+        """"""
+        return self.tick.bid_price_1 or self.tick.ask_price_1
+
+    def get_short_bound(self) -> float:
+        """"""
+        return self.tick.ask_price_1 or self.tick.bid_price_1
+
+    def add_order(self, orderid: str, direction: Direction, price: float) -> None:
+        """"""
+        tick = self.tick
+
+        if direction == Direction.LONG:
+            best_price = tick.bid_price_1
+            prices = (
+                tick.bid_price_1, tick.bid_price_2, tick.bid_price_3,
+                tick.bid_price_4, tick.bid_price_5
+            )
+            volumes = (
+                tick.bid_volume_1, tick.bid_volume_2, tick.bid_volume_3,
+                tick.bid_volume_4, tick.bid_volume_5
+            )
+            better = price > best_price
+        else:
+            best_price = tick.ask_price_1
+            prices = (
+                tick.ask_price_1, tick.ask_price_2, tick.ask_price_3,
+                tick.ask_price_4, tick.ask_price_5
+            )
+            volumes = (
+                tick.ask_volume_1, tick.ask_volume_2, tick.ask_volume_3,
+                tick.ask_volume_4, tick.ask_volume_5
+            )
+            better = price < best_price
+
+        if not best_price or better:
+            queue = 0
+        elif price in prices:
+            queue = volumes[prices.index(price)]
+        else:
+            # Level not visible, capped when it becomes the best level
+            queue = float("inf")
+
+        self.queues[orderid] = queue
+        self.new_orderids.add(orderid)
+
+    def remove_order(self, orderid: str) -> None:
+        """"""
+        self.queues.pop(orderid, None)
+
+    def match_order(
+        self,
+        orderid: str,
+        direction: Direction,
+        price: float,
+        volume: float
+    ) -> Tuple[float, float]:
+        """"""
+        tick = self.tick
+
+        if direction == Direction.LONG:
+            if tick.ask_price_1 and price >= tick.ask_price_1:
+                return self.take(direction, tick.ask_price_1, tick.ask_volume_1, volume)
+
+            level_price = tick.bid_price_1
+            level_volume = tick.bid_volume_1
+            traded_at = tick.last_price <= price
+            traded_through = tick.last_price < price
+            level_gone = level_price < price
+        else:
+            if tick.bid_price_1 and price <= tick.bid_price_1:
+                return self.take(direction, tick.bid_price_1, tick.bid_volume_1, volume)
+
+            level_price = tick.ask_price_1
+            level_volume = tick.ask_volume_1
+            traded_at = tick.last_price >= price
+            traded_through = tick.last_price > price
+            level_gone = level_price > price or not level_price
+
+        # Volume traded before order arrived does not fill it
+        if orderid in self.new_orderids:
+            return 0, 0
+
+        queue = self.queues.get(orderid, 0)
+        filled = 0
+
+        traded = self.traded
+        if traded and tick.last_price and traded_at:
+            if traded_through:
+                filled = volume
+            else:
+                # Volume already filled into earlier orders at this price
+                key = (direction, price)
+                allocated = self.allocated.get(key, 0)
+                filled = min(volume, max(traded - allocated - queue, 0))
+                self.allocated[key] = allocated + filled
+            queue = max(queue - traded, 0)
+
+        if level_price == price:
+            queue = min(queue, level_volume)
+        elif level_gone:
+            queue = 0
+
+        self.queues[orderid] = queue
+
+        if filled:
+            return price, filled
+        return 0, 0
+
+    def take(
+        self,
+        direction: Direction,
+        price: float,
+        level_volume: float,
+        volume: float
+    ) -> Tuple[float, float]:
+        """
+        Fill order as taker at best price of opposite side, limited by
+        volume of the level not taken by other orders yet.
+        """
+        if not level_volume:
+            return price, volume
+
+        key = (direction, price)
+        allocated = self.allocated.get(key, 0)
+        filled = min(volume, max(level_volume - allocated, 0))
+        if not filled:
+            return 0, 0
+
+        self.allocated[key] = allocated + filled
+        return price, filled
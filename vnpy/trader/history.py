@@ -0,0 +1,276 @@
+"""
+Read-through cache of history bar data.
+"""
+
+import json
+from collections import OrderedDict
+from copy import copy
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .constant import Exchange, Interval
+from .object import BarData, HistoryRequest
+from .columnar import BAR_DTYPE, BAR_FIELDS, sort_unique, write_atomic
+from .utility import TEMP_DIR
+from .database import database_manager
+from .database.database import DB_TZ
+
+
+def to_db_datetime(dt: datetime) -> np.datetime64:
+    """
+    Convert datetime into naive time in database timezone, naive
+    datetime is treated as in database timezone.
+    """
+    if dt.tzinfo and dt.tzinfo is not DB_TZ:
+        dt = dt.astimezone(DB_TZ)
+    return np.datetime64(dt.replace(tzinfo=None), "us")
+
+
+def from_db_datetime(dt: np.datetime64) -> datetime:
+    """"""
+    return DB_TZ.localize(dt.astype(datetime))
+
+
+def to_array(bars: List[BarData]) -> np.ndarray:
+    """"""
+    array = np.empty(len(bars), dtype=BAR_DTYPE)
+    array["datetime"] = [to_db_datetime(bar.datetime) for bar in bars]
+    for name in BAR_FIELDS:
+        array[name] = [getattr(bar, name) for bar in bars]
+    return array
+
+
+def query_database(req: HistoryRequest) -> List[BarData]:
+    """
+    Query history bar data from database.
+    """
+    return database_manager.load_bar_data(
+        req.symbol, req.exchange, req.interval, req.start, req.end
+    )
+
+
+class CachedSeries:
+    """
+    Bar data of one contract and the time range already queried.
+    """
+
+    def __init__(self, array: np.ndarray, start: np.datetime64, end: np.datetime64):
+        """"""
+        self.array: np.ndarray = array
+        self.start: np.datetime64 = start
+        self.end: np.datetime64 = end
+
+    def merge(self, array: np.ndarray, start: np.datetime64, end: np.datetime64) -> None:
+        """
+        Merge newly queried data, which replaces cached data with the
+        same datetime.
+        """
+        self.array = sort_unique(np.concatenate([self.array, array]))
+        self.start = min(self.start, start)
+        self.end = max(self.end, end)
+
+    def slice(self, start: np.datetime64, end: np.datetime64) -> np.ndarray:
+        """"""
+        datetimes = self.array["datetime"]
+        left = np.searchsorted(datetimes, start, side="left")
+        right = np.searchsorted(datetimes, end, side="right")
+        return self.array[left:right]
+
+
+class HistoryCache:
+    """
+    Bar data queried from gateway, RQData or database is cached for each
+    source + contract + interval, so that only the range not queried
+    before is sent to source:
+    1. range before the cached range is queried and merged
+    2. range after the cached range is queried from the newest cached
+    bar, since it may be unfinished when queried
+    3. range after is not queried again within refresh_interval, so
+    strategies of the same contract inited together share one query
+
+    Recently used data are kept in memory (LRU), and data can also be
+    saved into .npy files under the cache folder to be used after
+    restart.
+
+    Queries of the same data are serialized by lock, queries of
+    different data can run in parallel.
+    """
+
+    memory_size: int = 100
+    refresh_interval: timedelta = timedelta(seconds=60)
+
+    def __init__(self, folder: Path):
+        """"""
+        self.folder: Path = folder
+
+        self.series: OrderedDict = OrderedDict()
+        self.locks: Dict[tuple, Lock] = {}
+        self.lock: Lock = Lock()
+
+    def query_history(
+        self,
+        req: HistoryRequest,
+        query: Callable[[HistoryRequest], Optional[List[BarData]]],
+        source: str,
+        save: bool = True
+    ) -> List[BarData]:
+        """
+        Query history bar data through cache.
+
+        :param query: function for querying data from source
+        :param source: name of source, also used as gateway name of data
+        :param save: whether to save data into files
+        """
+        key = (source, req.symbol, req.exchange, req.interval)
+
+        start = to_db_datetime(req.start)
+        now = to_db_datetime(datetime.now(DB_TZ))
+        if req.end:
+            end = min(to_db_datetime(req.end), now)
+        else:
+            end = now
+
+        with self.get_lock(key):
+            series = self.get_series(key)
+
+            # Query whole range if cached range is too old
+            if series and start > series.end:
+                series = None
+
+            ranges = []
+            if not series:
+                ranges.append((start, end))
+            else:
+                if start < series.start:
+                    ranges.append((start, series.start))
+
+                if end - series.end > self.refresh_interval:
+                    if len(series.array):
+                        ranges.append((series.array["datetime"][-1], end))
+                    else:
+                        ranges.append((series.end, end))
+
+            for range_start, range_end in ranges:
+                sub_req = copy(req)
+                sub_req.start = from_db_datetime(range_start)
+                sub_req.end = from_db_datetime(range_end)
+
+                bars = query(sub_req)
+
+                # Source not available, nothing to cache
+                if bars is None:
+                    if not series:
+                        return []
+                    continue
+
+                array = sort_unique(to_array(bars))
+                if series:
+                    series.merge(array, range_start, range_end)
+                else:
+                    series = CachedSeries(array, range_start, range_end)
+
+            if ranges:
+                self.put_series(key, series, save)
+
+            array = series.slice(start, end)
+
+        return self.to_bars(array, source, req.symbol, req.exchange, req.interval)
+
+    def get_lock(self, key: tuple) -> Lock:
+        """"""
+        with self.lock:
+            return self.locks.setdefault(key, Lock())
+
+    def get_series(self, key: tuple) -> Optional[CachedSeries]:
+        """
+        Get series from memory, or load it from file.
+        """
+        with self.lock:
+            series = self.series.get(key, None)
+            if series:
+                self.series.move_to_end(key)
+                return series
+
+        path = self.get_path(key)
+        meta_path = path.with_suffix(".json")
+        if not meta_path.exists():
+            return None
+
+        with open(meta_path, encoding="UTF-8") as f:
+            meta = json.load(f)
+
+        series = CachedSeries(
+            np.load(path),
+            np.datetime64(meta["start"]),
+            np.datetime64(meta["end"])
+        )
+        self.add_series(key, series)
+
+        return series
+
+    def put_series(self, key: tuple, series: CachedSeries, save: bool) -> None:
+        """"""
+        self.add_series(key, series)
+
+        if not save:
+            return
+
+        path = self.get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        meta = {"start": str(series.start), "end": str(series.end)}
+        write_atomic(path, lambda f: np.save(f, series.array))
+        write_atomic(
+            path.with_suffix(".json"),
+            lambda f: f.write(json.dumps(meta).encode("UTF-8"))
+        )
+
+    def add_series(self, key: tuple, series: CachedSeries) -> None:
+        """
+        Keep series in memory, and remove least recently used ones.
+        """
+        with self.lock:
+            self.series[key] = series
+            self.series.move_to_end(key)
+
+            while len(self.series) > self.memory_size:
+                self.series.popitem(last=False)
+
+    def get_path(self, key: tuple) -> Path:
+        """"""
+        source, symbol, exchange, interval = key
+        return self.folder.joinpath(
+            source, exchange.value, f"{symbol}_{interval.value}.npy"
+        )
+
+    def clear(self) -> None:
+        """
+        Remove all data cached in memory.
+        """
+        with self.lock:
+            self.series.clear()
+
+    def to_bars(
+        self,
+        array: np.ndarray,
+        gateway_name: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> List[BarData]:
+        """"""
+        datetimes = array["datetime"].astype(object)
+        columns = [array[name].tolist() for name in BAR_FIELDS]
+
+        return [
+            BarData(gateway_name, symbol, exchange, DB_TZ.localize(dt), interval, *values)
+            for dt, *values in zip(datetimes, *columns)
+        ]
+
+
+# Folder is created when data is saved for the first time
+history_cache: HistoryCache = HistoryCache(TEMP_DIR.joinpath("history_cache"))
@@ -0,0 +1,495 @@
+"""
+Streaming technical indicators.
+
+Each indicator keeps its own state and is updated once per bar in O(1),
+instead of recalculating the whole window with TA-Lib. Warm up rules
+follow TA-Lib, so values match TA-Lib functions calculated over the full
+history since the first bar.
+"""
+
+from collections import deque
+from math import sqrt
+from typing import Deque, Tuple
+
+from .object import BarData
+
+
+class Indicator:
+    """
+    Base class of streaming indicators.
+    """
+
+    def __init__(self):
+        """"""
+        self.count: int = 0
+        self.inited: bool = False
+        self.value: float = 0
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update indicator with new bar data, close price by default.
+        """
+        self.update(bar.close_price)
+
+    def update(self, value: float) -> None:
+        """
+        Update indicator with new input value.
+        """
+        pass
+
+
+class SmaIndicator(Indicator):
+    """
+    Simple moving average.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.values: Deque[float] = deque()
+        self.total: float = 0
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        values = self.values
+        values.append(value)
+        self.total += value
+
+        if len(values) > self.n:
+            self.total -= values.popleft()
+
+        if len(values) == self.n:
+            self.inited = True
+            self.value = self.total / self.n
+
+
+class EmaIndicator(Indicator):
+    """
+    Exponential moving average, seeded with SMA of the first n values.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.k: float = 2 / (n + 1)
+        self.total: float = 0
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        if self.inited:
+            self.value += (value - self.value) * self.k
+        else:
+            self.total += value
+            if self.count == self.n:
+                self.inited = True
+                self.value = self.total / self.n
+
+
+class WilderIndicator(Indicator):
+    """
+    Wilder's smoothing, seeded with SMA of the first n values.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.total: float = 0
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        if self.inited:
+            self.value = (self.value * (self.n - 1) + value) / self.n
+        else:
+            self.total += value
+            if self.count == self.n:
+                self.inited = True
+                self.value = self.total / self.n
+
+
+class StdIndicator(Indicator):
+    """
+    Standard deviation (population) of the latest n values.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.values: Deque[float] = deque()
+        self.total: float = 0
+        self.square_total: float = 0
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        values = self.values
+        values.append(value)
+        self.total += value
+        self.square_total += value * value
+
+        if len(values) > self.n:
+            old = values.popleft()
+            self.total -= old
+            self.square_total -= old * old
+
+        if len(values) == self.n:
+            self.inited = True
+
+            mean = self.total / self.n
+            variance = self.square_total / self.n - mean * mean
+            self.value = sqrt(variance) if variance > 0 else 0
+
+
+class MaxIndicator(Indicator):
+    """
+    Highest value of the latest n values, using monotonic queue.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.queue: Deque[Tuple[int, float]] = deque()
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        queue = self.queue
+        while queue and queue[-1][1] <= value:
+            queue.pop()
+        queue.append((self.count, value))
+
+        if queue[0][0] <= self.count - self.n:
+            queue.popleft()
+
+        if self.count >= self.n:
+            self.inited = True
+            self.value = queue[0][1]
+
+
+class MinIndicator(Indicator):
+    """
+    Lowest value of the latest n values, using monotonic queue.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.queue: Deque[Tuple[int, float]] = deque()
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        queue = self.queue
+        while queue and queue[-1][1] >= value:
+            queue.pop()
+        queue.append((self.count, value))
+
+        if queue[0][0] <= self.count - self.n:
+            queue.popleft()
+
+        if self.count >= self.n:
+            self.inited = True
+            self.value = queue[0][1]
+
+
+class RsiIndicator(Indicator):
+    """
+    Relative strength index.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.gain: WilderIndicator = WilderIndicator(n)
+        self.loss: WilderIndicator = WilderIndicator(n)
+        self.last_value: float = 0
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        if self.count > 1:
+            change = value - self.last_value
+            self.gain.update(max(change, 0))
+            self.loss.update(max(-change, 0))
+
+            if self.gain.inited:
+                self.inited = True
+
+                total = self.gain.value + self.loss.value
+                if total:
+                    self.value = 100 * self.gain.value / total
+                else:
+                    self.value = 0
+
+        self.last_value = value
+
+
+class TrangeIndicator(Indicator):
+    """
+    True range, the first bar has no value.
+    """
+
+    def __init__(self):
+        """"""
+        super().__init__()
+
+        self.last_close: float = 0
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.count += 1
+
+        if self.count > 1:
+            self.inited = True
+            self.value = (
+                max(bar.high_price, self.last_close)
+                - min(bar.low_price, self.last_close)
+            )
+
+        self.last_close = bar.close_price
+
+
+class AtrIndicator(Indicator):
+    """
+    Average true range.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.trange: TrangeIndicator = TrangeIndicator()
+        self.average: WilderIndicator = WilderIndicator(n)
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.count += 1
+
+        trange = self.trange
+        trange.update_bar(bar)
+        if not trange.inited:
+            return
+
+        average = self.average
+        average.update(trange.value)
+        if average.inited:
+            self.inited = True
+            self.value = average.value
+
+
+class BollIndicator(Indicator):
+    """
+    Bollinger band, value is a tuple of (up, down).
+    """
+
+    def __init__(self, n: int, dev: float):
+        """"""
+        super().__init__()
+
+        self.dev: float = dev
+        self.sma: SmaIndicator = SmaIndicator(n)
+        self.std: StdIndicator = StdIndicator(n)
+        self.value: Tuple[float, float] = (0, 0)
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        self.sma.update(value)
+        self.std.update(value)
+
+        if self.sma.inited:
+            self.inited = True
+
+            mid = self.sma.value
+            width = self.std.value * self.dev
+            self.value = (mid + width, mid - width)
+
+
+class KeltnerIndicator(Indicator):
+    """
+    Keltner channel, value is a tuple of (up, down).
+    """
+
+    def __init__(self, n: int, dev: float):
+        """"""
+        super().__init__()
+
+        self.dev: float = dev
+        self.sma: SmaIndicator = SmaIndicator(n)
+        self.atr: AtrIndicator = AtrIndicator(n)
+        self.value: Tuple[float, float] = (0, 0)
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.count += 1
+
+        self.sma.update(bar.close_price)
+        self.atr.update_bar(bar)
+
+        if self.sma.inited and self.atr.inited:
+            self.inited = True
+
+            mid = self.sma.value
+            width = self.atr.value * self.dev
+            self.value = (mid + width, mid - width)
+
+
+class DonchianIndicator(Indicator):
+    """
+    Donchian channel, value is a tuple of (up, down).
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.high: MaxIndicator = MaxIndicator(n)
+        self.low: MinIndicator = MinIndicator(n)
+        self.value: Tuple[float, float] = (0, 0)
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.count += 1
+
+        self.high.update(bar.high_price)
+        self.low.update(bar.low_price)
+
+        if self.high.inited:
+            self.inited = True
+            self.value = (self.high.value, self.low.value)
+
+
+class MacdIndicator(Indicator):
+    """
+    MACD, value is a tuple of (macd, signal, hist).
+
+    Same as TA-Lib, fast EMA starts later so that it is seeded at the
+    same bar as slow EMA.
+    """
+
+    def __init__(self, fast_period: int, slow_period: int, signal_period: int):
+        """"""
+        super().__init__()
+
+        self.fast_start: int = slow_period - fast_period
+        self.fast: EmaIndicator = EmaIndicator(fast_period)
+        self.slow: EmaIndicator = EmaIndicator(slow_period)
+        self.signal: EmaIndicator = EmaIndicator(signal_period)
+        self.value: Tuple[float, float, float] = (0, 0, 0)
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        if self.count > self.fast_start:
+            self.fast.update(value)
+        self.slow.update(value)
+        if not self.slow.inited:
+            return
+
+        macd = self.fast.value - self.slow.value
+        signal = self.signal
+        signal.update(macd)
+
+        if signal.inited:
+            self.inited = True
+            self.value = (macd, signal.value, macd - signal.value)
+
+
+class AdxIndicator(Indicator):
+    """
+    Average directional movement index.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.trange: TrangeIndicator = TrangeIndicator()
+        self.average: WilderIndicator = WilderIndicator(n)
+
+        self.last_high: float = 0
+        self.last_low: float = 0
+
+        # Wilder sums of TR and DM, seeded with sum of the first n - 1
+        self.tr_sum: float = 0
+        self.plus_dm_sum: float = 0
+        self.minus_dm_sum: float = 0
+
+        self.plus_di: float = 0
+        self.minus_di: float = 0
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.count += 1
+
+        high = bar.high_price
+        low = bar.low_price
+        self.trange.update_bar(bar)
+
+        if self.count > 1:
+            up = high - self.last_high
+            down = self.last_low - low
+
+            plus_dm = up if (up > down and up > 0) else 0
+            minus_dm = down if (down > up and down > 0) else 0
+            trange = self.trange.value
+
+            n = self.n
+            if self.count > n:
+                self.tr_sum += trange - self.tr_sum / n
+                self.plus_dm_sum += plus_dm - self.plus_dm_sum / n
+                self.minus_dm_sum += minus_dm - self.minus_dm_sum / n
+                self.update_dx()
+            else:
+                self.tr_sum += trange
+                self.plus_dm_sum += plus_dm
+                self.minus_dm_sum += minus_dm
+
+        self.last_high = high
+        self.last_low = low
+
+    def update_dx(self) -> None:
+        """"""
+        if self.tr_sum:
+            self.plus_di = 100 * self.plus_dm_sum / self.tr_sum
+            self.minus_di = 100 * self.minus_dm_sum / self.tr_sum
+        else:
+            self.plus_di = 0
+            self.minus_di = 0
+
+        di_sum = self.plus_di + self.minus_di
+        if di_sum:
+            dx = 100 * abs(self.plus_di - self.minus_di) / di_sum
+        else:
+            dx = 0
+
+        average = self.average
+        average.update(dx)
+        if average.inited:
+            self.inited = True
+            self.value = average.value
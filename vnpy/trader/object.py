@@ -2,9 +2,10 @@
 Basic data structure used for general trading function in VN Trader.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
 from logging import INFO
+from typing import Callable, Dict, Sequence
 
 from .constant import Direction, Exchange, Interval, Offset, Status, Product, OptionType, OrderType
 
@@ -336,3 +337,93 @@ class HistoryRequest:
     def __post_init__(self):
         """"""
         self.vt_symbol = f"{self.symbol}.{self.exchange.value}"
+
+
+# Cache of vt_symbol strings: exchange -> symbol -> vt_symbol
+VT_SYMBOLS: Dict[Exchange, Dict[str, str]] = {}
+
+
+def get_vt_symbol(symbol: str, exchange: Exchange) -> str:
+    """
+    Get cached vt_symbol string, so that data objects of the same contract
+    share one string object instead of formatting a new one every time.
+    """
+    symbols = VT_SYMBOLS.get(exchange, None)
+    if symbols is None:
+        symbols = VT_SYMBOLS.setdefault(exchange, {})
+
+    vt_symbol = symbols.get(symbol, None)
+    if vt_symbol is None:
+        vt_symbol = symbols.setdefault(symbol, f"{symbol}.{exchange.value}")
+
+    return vt_symbol
+
+
+def create_compact_class(
+    cls: type,
+    post_init: Callable,
+    extra_slots: Sequence[str]
+) -> type:
+    """
+    Create compact variant of a data class, which stores attributes in
+    __slots__ instead of instance __dict__.
+
+    Fields, generated dataclass methods and other methods are copied from
+    the original class (and its bases), post_init replaces __post_init__
+    and extra_slots are attributes it sets besides dataclass fields.
+    """
+    field_names = [f.name for f in fields(cls)]
+
+    namespace = {}
+    for base in reversed(cls.__mro__[:-1]):
+        namespace.update(base.__dict__)
+
+    for name in field_names + ["__dict__", "__weakref__"]:
+        namespace.pop(name, None)
+
+    name = f"Compact{cls.__name__}"
+    namespace["__slots__"] = tuple(field_names) + tuple(extra_slots)
+    namespace["__qualname__"] = name
+    namespace["__post_init__"] = post_init
+
+    return type(name, (), namespace)
+
+
+def get_data_dict(data: object) -> dict:
+    """
+    Get attribute dict of data object, works for compact data objects
+    without __dict__ too.
+    """
+    if hasattr(data, "__dict__"):
+        return data.__dict__
+    return {name: getattr(data, name) for name in data.__slots__}
+
+
+def _post_init_symbol(self):
+    """"""
+    self.vt_symbol = get_vt_symbol(self.symbol, self.exchange)
+
+
+def _post_init_order(self):
+    """"""
+    self.vt_symbol = get_vt_symbol(self.symbol, self.exchange)
+    self.vt_orderid = f"{self.gateway_name}.{self.orderid}"
+
+
+def _post_init_trade(self):
+    """"""
+    self.vt_symbol = get_vt_symbol(self.symbol, self.exchange)
+    self.vt_orderid = f"{self.gateway_name}.{self.orderid}"
+    self.vt_tradeid = f"{self.gateway_name}.{self.tradeid}"
+
+
+# Compact variants with the same fields and behaviour as the original data
+# classes, for holding large amount of data objects in memory.
+CompactTickData = create_compact_class(TickData, _post_init_symbol, ["vt_symbol"])
+CompactBarData = create_compact_class(BarData, _post_init_symbol, ["vt_symbol"])
+CompactOrderData = create_compact_class(
+    OrderData, _post_init_order, ["vt_symbol", "vt_orderid"]
+)
+CompactTradeData = create_compact_class(
+    TradeData, _post_init_trade, ["vt_symbol", "vt_orderid", "vt_tradeid"]
+)
@@ -0,0 +1,473 @@
+"""
+Trading session aware bar generation.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from .constant import Exchange, Interval
+from .object import BarData, TickData
+
+
+class TradingSession:
+    """
+    Trading periods of one trading day, in trading order.
+
+    Trading day ends at the end of the last period. If it is not
+    midnight, data after it (e.g. night session) belongs to the next
+    trading day, and weekend is rolled forward to the next Monday.
+
+    Periods are grouped into segments split by breaks of at least
+    segment_gap minutes (e.g. between night and day session), trading
+    minutes are counted from the start of each segment.
+    """
+
+    segment_gap: int = 180
+
+    def __init__(self, periods: List[Tuple[time, time]]):
+        """"""
+        self.periods: List[Tuple[time, time]] = periods
+
+        end = periods[-1][1]
+        self.daily_end: int = end.hour * 60 + end.minute
+
+        # For every minute of day: (offset to the minute it belongs to,
+        # segment, trading minute index in segment, whether it is the
+        # last minute of segment, whether it is the last minute of day)
+        self.minutes: List[Tuple[int, int, int, bool, bool]] = [None] * 1440
+        self.init_minutes()
+
+    def init_minutes(self) -> None:
+        """"""
+        starts = []
+        last_minutes = []
+        segment = 0
+        index = 0
+
+        for start, end in self.periods:
+            start_minute = start.hour * 60 + start.minute
+            end_minute = end.hour * 60 + end.minute
+            length = (end_minute - start_minute) % 1440 or 1440
+
+            if starts:
+                gap = (start_minute - (last_minutes[-1] + 1)) % 1440
+                if gap >= self.segment_gap:
+                    self.set_last(last_minutes[-1], False)
+                    segment += 1
+                    index = 0
+
+            for i in range(length):
+                minute = (start_minute + i) % 1440
+                self.minutes[minute] = (0, segment, index, False, False)
+                index += 1
+
+            starts.append(start_minute)
+            last_minutes.append((end_minute - 1) % 1440)
+
+        self.set_last(last_minutes[-1], True)
+
+        # Data at end time (e.g. close tick at 15:00:00) belongs to the
+        # last minute of the period
+        for last_minute in last_minutes:
+            end_minute = (last_minute + 1) % 1440
+            if self.minutes[end_minute] is None:
+                self.minutes[end_minute] = (-1, *self.minutes[last_minute][1:])
+
+        # Data out of trading periods (e.g. auction before open) belongs
+        # to the first minute of the next period
+        for minute in range(1440):
+            if self.minutes[minute] is not None:
+                continue
+
+            offset = min((start - minute) % 1440 for start in starts)
+            self.minutes[minute] = (offset, *self.minutes[(minute + offset) % 1440][1:])
+
+    def set_last(self, minute: int, day_last: bool) -> None:
+        """
+        Mark minute as the last one of segment (and of day).
+        """
+        offset, segment, index, _, _ = self.minutes[minute]
+        self.minutes[minute] = (offset, segment, index, True, day_last)
+
+    def get_minute(self, dt: datetime) -> Tuple[datetime, int, int, bool, bool]:
+        """
+        Get the session minute which the datetime belongs to.
+
+        :return: (minute datetime, segment, trading minute index in
+        segment, last of segment, last of day)
+        """
+        offset, segment, index, segment_last, day_last = self.minutes[
+            dt.hour * 60 + dt.minute
+        ]
+
+        dt = dt.replace(second=0, microsecond=0)
+        if offset:
+            dt += timedelta(minutes=offset)
+
+        return dt, segment, index, segment_last, day_last
+
+    def get_trading_date(self, dt: datetime) -> date:
+        """
+        Get trading date of session minute datetime.
+        """
+        if not self.daily_end:
+            return dt.date()
+
+        trading_date = (dt + timedelta(minutes=1440 - self.daily_end)).date()
+
+        weekday = trading_date.weekday()
+        if weekday >= 5:
+            trading_date += timedelta(days=7 - weekday)
+
+        return trading_date
+
+
+def get_futures_session(night_end: time = None) -> TradingSession:
+    """
+    Get session of China commodity futures, with night session from
+    21:00 to night_end (no night session if None).
+    """
+    periods = [
+        (time(9, 0), time(10, 15)),
+        (time(10, 30), time(11, 30)),
+        (time(13, 30), time(15, 0))
+    ]
+    if night_end:
+        periods.insert(0, (time(21, 0), night_end))
+    return TradingSession(periods)
+
+
+CHINA_STOCK_SESSION: TradingSession = TradingSession([
+    (time(9, 30), time(11, 30)),
+    (time(13, 0), time(15, 0))
+])
+
+CHINA_INDEX_FUTURES_SESSION: TradingSession = CHINA_STOCK_SESSION
+
+CHINA_BOND_FUTURES_SESSION: TradingSession = TradingSession([
+    (time(9, 15), time(11, 30)),
+    (time(13, 0), time(15, 15))
+])
+
+CHINA_FUTURES_DAY_SESSION: TradingSession = get_futures_session()
+CHINA_FUTURES_2300_SESSION: TradingSession = get_futures_session(time(23, 0))
+CHINA_FUTURES_0100_SESSION: TradingSession = get_futures_session(time(1, 0))
+CHINA_FUTURES_0230_SESSION: TradingSession = get_futures_session(time(2, 30))
+
+# Covers the longest night session, for futures products not listed
+CHINA_FUTURES_SESSION: TradingSession = CHINA_FUTURES_0230_SESSION
+
+FULL_DAY_SESSION: TradingSession = TradingSession([
+    (time(0, 0), time(0, 0))
+])
+
+SESSION_TEMPLATES: Dict[Exchange, TradingSession] = {
+    Exchange.CFFEX: CHINA_INDEX_FUTURES_SESSION,
+    Exchange.SHFE: CHINA_FUTURES_SESSION,
+    Exchange.INE: CHINA_FUTURES_SESSION,
+    Exchange.DCE: CHINA_FUTURES_SESSION,
+    Exchange.CZCE: CHINA_FUTURES_SESSION,
+    Exchange.SSE: CHINA_STOCK_SESSION,
+    Exchange.SZSE: CHINA_STOCK_SESSION,
+}
+
+PRODUCT_SESSIONS: Dict[str, TradingSession] = {}
+
+for products, session in [
+    ("IF IC IH", CHINA_INDEX_FUTURES_SESSION),
+    ("T TF TS", CHINA_BOND_FUTURES_SESSION),
+    (
+        "wr jd fb bb lh AP CJ JR LR PM RI RS SF SM UR WH",
+        CHINA_FUTURES_DAY_SESSION
+    ),
+    (
+        "rb hc bu ru fu sp nr lu a b m y p c cs i j jm l v pp eg eb rr pg "
+        "SR CF RM MA TA OI FG ZC CY SA PF",
+        CHINA_FUTURES_2300_SESSION
+    ),
+    ("cu al zn pb ni sn ss bc", CHINA_FUTURES_0100_SESSION),
+    ("au ag sc", CHINA_FUTURES_0230_SESSION),
+]:
+    for product in products.split():
+        PRODUCT_SESSIONS[product] = session
+
+
+def get_session(exchange: Exchange, symbol: str = "") -> TradingSession:
+    """
+    Get session template of product (letters at the start of symbol),
+    or of exchange if product not listed, full day session by default.
+    """
+    if symbol:
+        match = re.match(r"[a-zA-Z]+", symbol)
+        if match and match.group() in PRODUCT_SESSIONS:
+            return PRODUCT_SESSIONS[match.group()]
+
+    return SESSION_TEMPLATES.get(exchange, FULL_DAY_SESSION)
+
+
+class SessionBarGenerator:
+    """
+    For:
+    1. generating 1 minute bar data from tick data
+    2. generating x minute/x hour/x day/x week bar data from 1 minute data
+
+    Notice:
+    1. x minute/x hour windows count trading minutes since the start of
+    session segment (night or day session), so x can be any number and
+    windows never cross segments or days
+    2. night session belongs to the next trading day
+    3. session template is chosen by product of symbol, products not
+    listed use template of exchange (the longest night session for
+    futures), pass custom session for them if needed
+    4. x day/x week bars are generated every window (at least 1) units
+    """
+
+    def __init__(
+        self,
+        on_bar: Callable,
+        window: int = 0,
+        on_window_bar: Callable = None,
+        interval: Interval = Interval.MINUTE,
+        session: TradingSession = None
+    ):
+        """Constructor"""
+        self.bar: BarData = None
+        self.on_bar: Callable = on_bar
+
+        self.interval: Interval = interval
+        self.interval_count: int = 0
+
+        self.window: int = window
+        self.window_bar: BarData = None
+        self.on_window_bar: Callable = on_window_bar
+
+        self.session: TradingSession = session
+        self.unit_key: tuple = None
+
+        if interval == Interval.MINUTE:
+            self.unit_minutes: int = window
+        elif interval == Interval.HOUR:
+            self.unit_minutes: int = window * 60
+        else:
+            self.unit_minutes: int = 0
+
+        self.last_tick: TickData = None
+        self.last_date: date = None
+
+    def get_session(self, exchange: Exchange, symbol: str) -> TradingSession:
+        """"""
+        if not self.session:
+            self.session = get_session(exchange, symbol)
+        return self.session
+
+    def update_tick(self, tick: TickData) -> None:
+        """
+        Update new tick data into generator.
+        """
+        # Filter tick data with 0 last price
+        if not tick.last_price:
+            return
+
+        # Filter tick data with older timestamp
+        if self.last_tick and tick.datetime < self.last_tick.datetime:
+            return
+
+        session = self.get_session(tick.exchange, tick.symbol)
+        dt = session.get_minute(tick.datetime)[0]
+
+        if self.bar and self.bar.datetime != dt:
+            self.on_bar(self.bar)
+            self.bar = None
+
+        if not self.bar:
+            self.bar = BarData(
+                symbol=tick.symbol,
+                exchange=tick.exchange,
+                interval=Interval.MINUTE,
+                datetime=dt,
+                gateway_name=tick.gateway_name,
+                open_price=tick.last_price,
+                high_price=tick.last_price,
+                low_price=tick.last_price,
+                close_price=tick.last_price,
+                open_interest=tick.open_interest
+            )
+        else:
+            self.bar.high_price = max(self.bar.high_price, tick.last_price)
+            self.bar.low_price = min(self.bar.low_price, tick.last_price)
+            self.bar.close_price = tick.last_price
+            self.bar.open_interest = tick.open_interest
+
+        # Accumulated volume restarts from 0 on new trading day
+        trading_date = session.get_trading_date(dt)
+
+        if self.last_tick and trading_date == self.last_date:
+            volume_change = tick.volume - self.last_tick.volume
+            self.bar.volume += max(volume_change, 0)
+        elif self.last_tick:
+            self.bar.volume += tick.volume
+
+        self.last_tick = tick
+        self.last_date = trading_date
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update 1 minute bar into generator
+        """
+        session = self.get_session(bar.exchange, bar.symbol)
+        dt, segment, index, segment_last, day_last = session.get_minute(bar.datetime)
+        trading_date = session.get_trading_date(dt)
+
+        # Get key and end flag of the unit which bar belongs to
+        if self.unit_minutes:
+            unit_key = (trading_date, segment, index // self.unit_minutes)
+            unit_end = segment_last or not (index + 1) % self.unit_minutes
+        elif self.interval == Interval.WEEKLY:
+            unit_key = trading_date.isocalendar()[:2]
+            unit_end = day_last and trading_date.weekday() == 4
+        else:
+            unit_key = trading_date
+            unit_end = day_last
+
+        # Finish last unit if its last minute is missing
+        if self.unit_key and unit_key != self.unit_key:
+            self.finish_unit()
+
+        # If not inited, creaate window bar object
+        if not self.window_bar:
+            if not self.unit_minutes:
+                dt = datetime.combine(trading_date, time(), dt.tzinfo)
+
+            self.window_bar = BarData(
+                symbol=bar.symbol,
+                exchange=bar.exchange,
+                interval=self.interval,
+                datetime=dt,
+                gateway_name=bar.gateway_name,
+                open_price=bar.open_price,
+                high_price=bar.high_price,
+                low_price=bar.low_price
+            )
+        # Otherwise, update high/low price into window bar
+        else:
+            self.window_bar.high_price = max(
+                self.window_bar.high_price, bar.high_price)
+            self.window_bar.low_price = min(
+                self.window_bar.low_price, bar.low_price)
+
+        # Update close price/volume into window bar
+        self.window_bar.close_price = bar.close_price
+        self.window_bar.volume += bar.volume
+        self.window_bar.open_interest = bar.open_interest
+
+        self.unit_key = unit_key
+        if unit_end:
+            self.finish_unit()
+
+    def finish_unit(self) -> None:
+        """
+        Finish current minute window/day/week, and generate window bar
+        if enough units are finished.
+        """
+        self.unit_key = None
+
+        if not self.unit_minutes and self.window > 1:
+            self.interval_count += 1
+            if self.interval_count % self.window:
+                return
+            self.interval_count = 0
+
+        self.on_window_bar(self.window_bar)
+        self.window_bar = None
+
+    def generate(self) -> None:
+        """
+        Generate the bar data and call callback immediately.
+        """
+        bar = self.bar
+
+        if self.bar:
+            self.on_bar(bar)
+
+        self.bar = None
+        return bar
+
+
+class TickBarGenerator:
+    """
+    For generating bar data from every x ticks or every x volume traded.
+    """
+
+    def __init__(
+        self,
+        on_bar: Callable,
+        tick_count: int = 0,
+        volume: float = 0
+    ):
+        """Constructor"""
+        self.bar: BarData = None
+        self.on_bar: Callable = on_bar
+
+        self.tick_count: int = tick_count
+        self.volume: float = volume
+        self.count: int = 0
+
+        self.last_tick: TickData = None
+
+    def update_tick(self, tick: TickData) -> None:
+        """
+        Update new tick data into generator.
+        """
+        # Filter tick data with 0 last price
+        if not tick.last_price:
+            return
+
+        # Filter tick data with older timestamp
+        if self.last_tick and tick.datetime < self.last_tick.datetime:
+            return
+
+        if not self.bar:
+            self.bar = BarData(
+                symbol=tick.symbol,
+                exchange=tick.exchange,
+                datetime=tick.datetime,
+                gateway_name=tick.gateway_name,
+                open_price=tick.last_price,
+                high_price=tick.last_price,
+                low_price=tick.last_price,
+                close_price=tick.last_price,
+                open_interest=tick.open_interest
+            )
+        else:
+            self.bar.high_price = max(self.bar.high_price, tick.last_price)
+            self.bar.low_price = min(self.bar.low_price, tick.last_price)
+            self.bar.close_price = tick.last_price
+            self.bar.open_interest = tick.open_interest
+
+        if self.last_tick:
+            volume_change = tick.volume - self.last_tick.volume
+            self.bar.volume += max(volume_change, 0)
+
+        self.last_tick = tick
+        self.count += 1
+
+        # Check if bar completed
+        if (
+            (self.tick_count and self.count >= self.tick_count)
+            or (self.volume and self.bar.volume >= self.volume)
+        ):
+            self.generate()
+
+    def generate(self) -> None:
+        """
+        Generate the bar data and call callback immediately.
+        """
+        bar = self.bar
+
+        if self.bar:
+            self.on_bar(bar)
+
+        self.bar = None
+        self.count = 0
+        return bar
@@ -192,6 +192,7 @@ class BaseMonitor(QtWidgets.QTableWidget):
     event_type: str = ""
     data_key: str = ""
     sorting: bool = False
+    latest_only: bool = False
     headers: Dict[str, dict] = {}
 
     signal: QtCore.pyqtSignal = QtCore.pyqtSignal(Event)
@@ -246,7 +247,11 @@ class BaseMonitor(QtWidgets.QTableWidget):
         """
         if self.event_type:
             self.signal.connect(self.process_event)
-            self.event_engine.register(self.event_type, self.signal.emit)
+            self.event_engine.register(
+                self.event_type,
+                self.signal.emit,
+                latest_only=self.latest_only
+            )
 
     def process_event(self, event: Event) -> None:
         """
@@ -351,6 +356,7 @@ class TickMonitor(BaseMonitor):
     event_type = EVENT_TICK
     data_key = "vt_symbol"
     sorting = True
+    latest_only = True
 
     headers = {
         "symbol": {"display": "代码", "cell": BaseCell, "update": False},
@@ -739,7 +745,9 @@ class TradingWidget(QtWidgets.QWidget):
     def register_event(self) -> None:
         """"""
         self.signal_tick.connect(self.process_tick_event)
-        self.event_engine.register(EVENT_TICK, self.signal_tick.emit)
+        self.event_engine.register(
+            EVENT_TICK, self.signal_tick.emit, latest_only=True
+        )
 
     def process_tick_event(self, event: Event) -> None:
         """"""
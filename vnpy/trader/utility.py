@@ -6,7 +6,7 @@ import json
 import logging
 import sys
 from pathlib import Path
-from typing import Callable, Dict, Tuple, Union
+from typing import Callable, Dict, List, Tuple, Union
 from decimal import Decimal
 from math import floor, ceil
 
@@ -15,6 +15,7 @@ import talib
 
 from .object import BarData, TickData
 from .constant import Exchange, Interval
+from .indicator import Indicator
 
 
 log_formatter = logging.Formatter('[%(asctime)s] %(message)s')
@@ -339,6 +340,8 @@ class ArrayManager(object):
         self.volume_array: np.ndarray = np.zeros(size)
         self.open_interest_array: np.ndarray = np.zeros(size)
 
+        self.indicators: List[Indicator] = []
+
     def update_bar(self, bar: BarData) -> None:
         """
         Update new bar data into array manager.
@@ -361,6 +364,27 @@ class ArrayManager(object):
         self.volume_array[-1] = bar.volume
         self.open_interest_array[-1] = bar.open_interest
 
+        for indicator in self.indicators:
+            indicator.update_bar(bar)
+
+    def add_indicator(self, indicator: Indicator) -> Indicator:
+        """
+        Add streaming indicator updated with every new bar.
+
+        Streaming indicators cost O(1) per bar no matter how large the
+        size is, use them instead of methods below in performance
+        critical strategies:
+
+            self.atr = self.am.add_indicator(AtrIndicator(14))
+            ...
+            atr_value = self.atr.value
+
+        Notice that EMA based indicators are calculated since the first
+        bar, while TA-Lib methods below only use the latest size bars.
+        """
+        self.indicators.append(indicator)
+        return indicator
+
     @property
     def open(self) -> np.ndarray:
         """
@@ -807,6 +831,88 @@ class ArrayManager(object):
         return result[-1]
 
 
+class RingArrayManager(ArrayManager):
+    """
+    ArrayManager backed by ring buffer, update_bar costs O(1) no matter
+    how large the size is.
+
+    Every value is written twice, at pos and pos + size of a buffer with
+    double length, so the latest size values are always a contiguous
+    ordered slice of the buffer which can be passed to TA-Lib directly.
+
+    Notice that the time series returned are views of the buffer at the
+    time of access, keep using the properties instead of caching them.
+    """
+
+    def __init__(self, size: int = 100):
+        """Constructor"""
+        self.count: int = 0
+        self.size: int = size
+        self.inited: bool = False
+
+        self.pos: int = 0
+        self.buffer: np.ndarray = np.zeros((6, size * 2))
+
+        self.indicators: List[Indicator] = []
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update new bar data into array manager.
+        """
+        self.count += 1
+        if not self.inited and self.count >= self.size:
+            self.inited = True
+
+        buffer = self.buffer
+        pos = self.pos
+        mirror = pos + self.size
+
+        buffer[0, pos] = buffer[0, mirror] = bar.open_price
+        buffer[1, pos] = buffer[1, mirror] = bar.high_price
+        buffer[2, pos] = buffer[2, mirror] = bar.low_price
+        buffer[3, pos] = buffer[3, mirror] = bar.close_price
+        buffer[4, pos] = buffer[4, mirror] = bar.volume
+        buffer[5, pos] = buffer[5, mirror] = bar.open_interest
+
+        pos += 1
+        if pos == self.size:
+            pos = 0
+        self.pos = pos
+
+        for indicator in self.indicators:
+            indicator.update_bar(bar)
+
+    @property
+    def open_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[0, self.pos:self.pos + self.size]
+
+    @property
+    def high_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[1, self.pos:self.pos + self.size]
+
+    @property
+    def low_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[2, self.pos:self.pos + self.size]
+
+    @property
+    def close_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[3, self.pos:self.pos + self.size]
+
+    @property
+    def volume_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[4, self.pos:self.pos + self.size]
+
+    @property
+    def open_interest_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[5, self.pos:self.pos + self.size]
+
+
 def virtual(func: Callable) -> Callable:
     """
     mark a function as "virtual", which means that this function can be override.